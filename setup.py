@@ -51,7 +51,7 @@ setup(
     package_dir={'': 'src'},
     include_package_data=True,
     package_data={
-        PYTHON_PKG: ['templates/**/*', 'dashboard'],  # templates/*.jinja
+        PYTHON_PKG: ['templates/**/*', 'dashboard/*'],  # templates/*.jinja
     },
     classifiers=[
         'Development Status :: 3 - Alpha',
@@ -80,6 +80,7 @@ setup(
     ],
     extras_require={
         'dev': ['pytest', 'tox'],
+        'numpy': ['numpy>=1.24'],
     },
     zip_safe=False,
     project_urls={
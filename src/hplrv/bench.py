@@ -0,0 +1,554 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André Santos
+
+"""
+Module that contains the 'bench' command line program and a benchmark suite
+for generated monitors.
+
+Each case generates the library of one property, for every combination of
+pattern, scope and timeout, and feeds it a synthetic high-rate trace.
+Reports hold the throughput, per-message latency percentiles and peak memory
+of each case, and can be saved as JSON to compare releases of hplrv.
+
+With `--generation`, it measures the code generator itself instead:
+parsing, builder construction, template rendering and library assembly,
+for synthetic specifications of increasing size.
+"""
+
+###############################################################################
+# Imports
+###############################################################################
+
+from typing import Any, Final, cast
+
+from collections.abc import Callable, Iterable
+
+import argparse
+from cProfile import Profile
+import json
+from pathlib import Path
+import platform
+from random import Random
+from time import perf_counter_ns
+import tracemalloc
+from types import SimpleNamespace
+
+from attrs import asdict, field, frozen
+from hpl.parser import specification_parser
+
+from hplrv import __version__ as current_version
+from hplrv.cli import positive_float, positive_int
+from hplrv.gen import MonitorGenerator, TemplateRenderer, lib_from_properties
+
+###############################################################################
+# Constants
+###############################################################################
+
+PROG_BENCH: Final[str] = 'hpl-rv bench'
+
+SCOPES: Final[dict[str, str]] = {
+    'global': 'globally',
+    'after': 'after /p {x > 0}',
+    'until': 'until /q {x > 9}',
+    'after-until': 'after /p {x > 0} until /q {x > 9}',
+}
+
+PATTERNS: Final[dict[str, str]] = {
+    'absence': 'no /b {x > 9}',
+    'existence': 'some /b {x > 0}',
+    'requirement': '/b {x > 0} requires /a {x > 0}',
+    'response': '/a {x > 0} causes /b {x > 0}',
+    'prevention': '/a {x > 0} forbids /b {x > 9}',
+}
+
+TIMEOUT: Final[str] = 'within 100 ms'
+
+TOPICS: Final[tuple[str, ...]] = ('/p', '/q', '/a', '/b')
+
+PERCENTILES: Final[tuple[int, ...]] = (50, 90, 99)
+
+# memory is traced in a separate, shorter run, since tracing is slow
+MEMORY_MESSAGES: Final[int] = 10000
+
+GENERATION_SIZES: Final[tuple[int, ...]] = (10, 100, 1000, 10000)
+
+GENERATION_STAGES: Final[tuple[str, ...]] = ('parse', 'build', 'render', 'library')
+
+###############################################################################
+# Data Structures
+###############################################################################
+
+
+@frozen
+class BenchmarkCase:
+    name: str
+    pattern: str
+    scope: str
+    timeout: bool
+    text: str
+
+
+@frozen
+class CaseResult:
+    name: str
+    property: str
+    messages: int
+    messages_per_second: float
+    latency_ns: dict[str, int]
+    peak_memory_bytes: int
+    # monitors are relaunched upon each verdict, to keep them busy
+    relaunches: int
+
+
+@frozen
+class GenerationResult:
+    name: str
+    properties: int
+    # wall time of each stage, in milliseconds
+    stages_ms: dict[str, float]
+    # rendering time of each template during library assembly, in milliseconds
+    templates_ms: dict[str, float]
+    properties_per_second: float
+    library_bytes: int
+
+
+@frozen
+class TimedRenderer(TemplateRenderer):
+    # accumulated rendering time of each template file, in nanoseconds
+    times: dict[str, int] = field(factory=dict)
+
+    def render_template(
+        self,
+        template_file: str,
+        data: dict[str, Any],
+        strip: bool = True,
+        encoding: str | None = None
+    ) -> str:
+        t = perf_counter_ns()
+        text = super().render_template(template_file, data, strip=strip, encoding=encoding)
+        self.times[template_file] = self.times.get(template_file, 0) + perf_counter_ns() - t
+        return text
+
+
+###############################################################################
+# Interface
+###############################################################################
+
+
+def benchmark_cases() -> list[BenchmarkCase]:
+    """
+    Returns one case for every combination of pattern, scope and timeout.
+    """
+    cases = []
+    for pattern, behaviour in PATTERNS.items():
+        for scope, prefix in SCOPES.items():
+            for timeout in (False, True):
+                text = f'{prefix}: {behaviour}'
+                name = f'{pattern}/{scope}'
+                if timeout:
+                    text = f'{text} {TIMEOUT}'
+                    name = f'{name}/within'
+                cases.append(BenchmarkCase(name, pattern, scope, timeout, text))
+    return cases
+
+
+def synthetic_trace(n: int, rate: float, seed: int) -> list[tuple[str, float, Any]]:
+    """
+    Returns `n` messages, as (topic, timestamp, data) tuples,
+    with random topics and values, published at the given rate (Hz).
+    """
+    rng = Random(seed)
+    period = 1.0 / rate
+    return [
+        (rng.choice(TOPICS), i * period, SimpleNamespace(x=rng.randint(-10, 10)))
+        for i in range(n)
+    ]
+
+
+def run_case(
+    case: BenchmarkCase,
+    trace: list[tuple[str, float, Any]],
+    timer_period: float = 0.1,
+    memory: bool = True,
+) -> CaseResult:
+    namespace: dict[str, Any] = {}
+    code = lib_from_properties([case.text], live_server=False)
+    exec(compile(code, f'<{case.name}>', 'exec'), namespace)
+    latencies: list[int] = []
+    relaunches = _feed(namespace['HplMonitorManager'], trace, timer_period, latencies)
+    elapsed = sum(latencies)
+    latencies.sort()
+    n = len(latencies)
+    percentiles = {f'p{p}': latencies[min(n - 1, n * p // 100)] if n else 0 for p in PERCENTILES}
+    percentiles['max'] = latencies[-1] if n else 0
+    peak = 0
+    if memory:
+        tracemalloc.start()
+        try:
+            _feed(namespace['HplMonitorManager'], trace[:MEMORY_MESSAGES], timer_period, None)
+            _current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return CaseResult(
+        case.name,
+        case.text,
+        n,
+        (n * 1e9 / elapsed) if elapsed else 0.0,
+        percentiles,
+        peak,
+        relaunches,
+    )
+
+
+def run_benchmark(
+    messages: int = 100000,
+    rate: float = 1000.0,
+    seed: int = 0,
+    select: str | None = None,
+    memory: bool = True,
+) -> dict[str, Any]:
+    """
+    Runs every case (or those whose name contains `select`)
+    and returns a report that can be saved as JSON.
+    """
+    trace = synthetic_trace(messages, rate, seed)
+    results = [
+        asdict(run_case(case, trace, memory=memory))
+        for case in benchmark_cases()
+        if not select or select in case.name
+    ]
+    return {
+        'hplrv': current_version,
+        'python': platform.python_version(),
+        'messages': messages,
+        'rate': rate,
+        'seed': seed,
+        'results': results,
+    }
+
+
+def synthetic_spec(n: int, seed: int = 0) -> str:
+    """
+    Returns a specification with `n` properties, drawn at random from the
+    benchmark cases with random topic suffixes and literals, so that some of
+    them share monitor classes and others do not.
+    """
+    rng = Random(seed)
+    cases = benchmark_cases()
+    lines = []
+    for i in range(n):
+        text = rng.choice(cases).text
+        for topic in TOPICS:
+            text = text.replace(f'{topic} ', f'{topic}{rng.randrange(n)} ')
+        text = text.replace('> 0', f'> {rng.randint(0, 5)}')
+        lines.append(text)
+    return '\n\n'.join(lines)
+
+
+def run_generation_case(
+    n: int,
+    seed: int = 0,
+    profile_dir: Path | None = None,
+) -> GenerationResult:
+    """
+    Times each stage of code generation for a specification of size `n`,
+    with a fresh template environment (i.e., including template loading).
+    If `profile_dir` is given, each stage also dumps cProfile statistics
+    to `<n>-<stage>.prof` (which inflates the timings).
+    """
+    text = synthetic_spec(n, seed=seed)
+    stages = {}
+    parser = specification_parser()
+    spec, stages['parse'] = _stage(profile_dir, n, 'parse', parser.parse, text)
+    properties = spec.properties
+    renderer = cast(TimedRenderer, TimedRenderer.from_pkg_data())
+    gen = MonitorGenerator(renderer=renderer, live_server=False)
+    builders, stages['build'] = _stage(
+        profile_dir,
+        n,
+        'build',
+        lambda: [gen.data_for_monitor_class(p) for p in properties],
+    )
+    _, stages['render'] = _stage(
+        profile_dir,
+        n,
+        'render',
+        lambda: [gen.renderer.render_template(data['template_file'], data) for data in builders],
+    )
+    renderer.times.clear()
+    code, stages['library'] = _stage(profile_dir, n, 'library', gen.monitor_library, properties)
+    total = stages['library']
+    return GenerationResult(
+        str(n),
+        n,
+        {stage: ns / 1e6 for stage, ns in stages.items()},
+        {name: ns / 1e6 for name, ns in sorted(renderer.times.items())},
+        (n * 1e9 / total) if total else 0.0,
+        len(code),
+    )
+
+
+def run_generation_benchmark(
+    sizes: Iterable[int] = GENERATION_SIZES,
+    seed: int = 0,
+    profile_dir: Path | None = None,
+) -> dict[str, Any]:
+    """
+    Runs the generation benchmark for each specification size
+    and returns a report that can be saved as JSON.
+    """
+    if profile_dir is not None:
+        profile_dir.mkdir(parents=True, exist_ok=True)
+    results = [asdict(run_generation_case(n, seed=seed, profile_dir=profile_dir)) for n in sizes]
+    return {
+        'hplrv': current_version,
+        'python': platform.python_version(),
+        'seed': seed,
+        'results': results,
+    }
+
+
+def compare_reports(
+    baseline: dict[str, Any],
+    report: dict[str, Any],
+    tolerance: float = 0.1,
+) -> list[str]:
+    """
+    Returns the names of the cases whose throughput (messages or properties
+    per second) dropped by more than `tolerance` (a fraction)
+    with respect to the baseline.
+    """
+    previous = {r['name']: r for r in baseline['results']}
+    regressions = []
+    for result in report['results']:
+        old = previous.get(result['name'])
+        if old is None or not _throughput(old):
+            continue
+        ratio = _throughput(result) / _throughput(old)
+        if ratio < 1.0 - tolerance:
+            regressions.append(result['name'])
+    return regressions
+
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+
+def _feed(
+    manager_class: type,
+    trace: Iterable[tuple[str, float, Any]],
+    timer_period: float,
+    latencies: list[int] | None,
+) -> int:
+    # returns the number of relaunches; latencies are appended, if given
+    decided = []
+    man = manager_class(
+        success_cb=lambda *args: decided.append(True),
+        failure_cb=lambda *args: decided.append(False),
+    )
+    callbacks = {topic: getattr(man, 'on_msg_' + topic.replace('/', '_'), None) for topic in TOPICS}
+    relaunches = 0
+    man.launch(0.0)
+    next_timer = timer_period
+    for topic, stamp, data in trace:
+        cb = callbacks[topic]
+        if cb is None:
+            continue
+        if stamp >= next_timer:
+            man.on_timer(stamp)
+            next_timer += timer_period
+        if latencies is None:
+            cb(data, stamp)
+        else:
+            t = perf_counter_ns()
+            cb(data, stamp)
+            latencies.append(perf_counter_ns() - t)
+        if decided:
+            decided.clear()
+            man.shutdown(stamp)
+            man.launch(stamp)
+            relaunches += 1
+    return relaunches
+
+
+def _stage(
+    profile_dir: Path | None,
+    n: int,
+    stage: str,
+    fun: Callable[..., Any],
+    *args: Any,
+) -> tuple[Any, int]:
+    # returns the result of the stage and its wall time (ns)
+    if profile_dir is None:
+        t = perf_counter_ns()
+        result = fun(*args)
+        return result, perf_counter_ns() - t
+    profiler = Profile()
+    t = perf_counter_ns()
+    result = profiler.runcall(fun, *args)
+    elapsed = perf_counter_ns() - t
+    profiler.dump_stats(profile_dir / f'{n}-{stage}.prof')
+    return result, elapsed
+
+
+def _throughput(result: dict[str, Any]) -> float:
+    if 'properties_per_second' in result:
+        return float(result['properties_per_second'])
+    return float(result['messages_per_second'])
+
+
+def _print_generation_report(report: dict[str, Any]) -> None:
+    print(f'hplrv {report["hplrv"]}, Python {report["python"]}')
+    header = ''.join(f'{stage + " ms":>12}' for stage in GENERATION_STAGES)
+    print(f'{"properties":>10}{header}{"prop/s":>12}{"KiB":>10}')
+    for r in report['results']:
+        stages = ''.join(f'{r["stages_ms"][stage]:>12.1f}' for stage in GENERATION_STAGES)
+        print(
+            f'{r["properties"]:>10}{stages}{r["properties_per_second"]:>12.0f}'
+            f'{r["library_bytes"] / 1024:>10.1f}'
+        )
+    for r in report['results']:
+        print(f'templates, {r["properties"]} properties:')
+        for name, ms in r['templates_ms'].items():
+            print(f'  {name:<40}{ms:>12.1f} ms')
+
+
+def _print_report(report: dict[str, Any]) -> None:
+    print(f'hplrv {report["hplrv"]}, Python {report["python"]}, {report["messages"]} messages')
+    print(f'{"case":<32}{"msg/s":>12}{"p50 ns":>10}{"p99 ns":>10}{"max ns":>12}{"peak KiB":>10}')
+    for r in report['results']:
+        latency = r['latency_ns']
+        print(
+            f'{r["name"]:<32}{r["messages_per_second"]:>12.0f}{latency["p50"]:>10}'
+            f'{latency["p99"]:>10}{latency["max"]:>12}{r["peak_memory_bytes"] / 1024:>10.1f}'
+        )
+
+
+###############################################################################
+# Entry Point
+###############################################################################
+
+
+def subprogram(
+    argv: list[str] | None,
+    _settings: dict[str, Any] | None = None,
+) -> int:
+    args = parse_arguments(argv)
+    return run(args, _settings or {})
+
+
+def run(args: dict[str, Any], _settings: dict[str, Any]) -> int:
+    if args['generation']:
+        profile_dir = Path(args['profile']).resolve() if args.get('profile') else None
+        report = run_generation_benchmark(
+            sizes=args['sizes'],
+            seed=args['seed'],
+            profile_dir=profile_dir,
+        )
+        _print_generation_report(report)
+    else:
+        report = run_benchmark(
+            messages=args['messages'],
+            rate=args['rate'],
+            seed=args['seed'],
+            select=args.get('select'),
+            memory=args['memory'],
+        )
+        _print_report(report)
+    if args.get('output'):
+        path: Path = Path(args['output']).resolve(strict=False)
+        path.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    if args.get('compare'):
+        path = Path(args['compare']).resolve(strict=True)
+        baseline = json.loads(path.read_text(encoding='utf-8'))
+        regressions = compare_reports(baseline, report, tolerance=args['tolerance'])
+        for name in regressions:
+            print(f'{PROG_BENCH}: throughput regression in {name}')
+        if regressions:
+            return 1
+    return 0
+
+
+###############################################################################
+# Argument Parsing
+###############################################################################
+
+
+def parse_arguments(argv: list[str] | None) -> dict[str, Any]:
+    description = 'Benchmark generated monitors with synthetic traces.'
+    parser = argparse.ArgumentParser(prog=PROG_BENCH, description=description)
+
+    parser.add_argument('-o', '--output', help='JSON file to save the report to')
+
+    parser.add_argument(
+        '-g',
+        '--generation',
+        action='store_true',
+        help='benchmark the code generator instead of the generated monitors',
+    )
+
+    parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=list(GENERATION_SIZES),
+        metavar='N',
+        help='number of properties of each specification (with --generation)',
+    )
+
+    parser.add_argument(
+        '--profile',
+        metavar='DIR',
+        help='save cProfile statistics of each stage to DIR (with --generation)',
+    )
+
+    parser.add_argument(
+        '-n',
+        '--messages',
+        type=positive_int,
+        default=100000,
+        help='number of messages in the trace (default: 100000)',
+    )
+
+    parser.add_argument(
+        '-r',
+        '--rate',
+        type=positive_float,
+        default=1000.0,
+        help='message rate of the trace, in Hz (default: 1000)',
+    )
+
+    parser.add_argument('--seed', type=int, default=0, help='random seed (default: 0)')
+
+    parser.add_argument(
+        '-s',
+        '--select',
+        metavar='TEXT',
+        help='only run cases whose name contains TEXT (e.g., "response/after")',
+    )
+
+    parser.add_argument(
+        '--no-memory',
+        dest='memory',
+        action='store_false',
+        help='skip the peak memory measurements',
+    )
+
+    parser.add_argument(
+        '-c',
+        '--compare',
+        metavar='JSON',
+        help='baseline report; exits with 1 upon throughput regressions',
+    )
+
+    parser.add_argument(
+        '-t',
+        '--tolerance',
+        type=float,
+        default=0.1,
+        help='throughput drop that counts as a regression (default: 0.1)',
+    )
+
+    args = parser.parse_args(args=argv)
+    return vars(args)
@@ -0,0 +1,747 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André Santos
+
+"""
+Module that contains the 'check' command line program and an offline engine
+to check recorded traces against HPL properties.
+
+The engine stores the messages of each topic in columns, and evaluates the
+predicates of each property over whole columns with NumPy. Messages that
+cannot trigger any event of a monitor are skipped, and the remaining ones
+are fed to the generated monitor, so verdicts and witnesses are the same as
+those of online monitoring.
+
+With multiple jobs, monitors are sharded across worker processes, balanced by
+the number of messages they subscribe to, and each worker only receives the
+topics its monitors need. Long traces can also be split into chunks.
+Chunks are cut where the monitor returns to its initial state (e.g., at the end
+of each `after ... until` instance), and a chunk that ends in any other state
+makes the remainder of the trace be checked sequentially.
+"""
+
+###############################################################################
+# Imports
+###############################################################################
+
+from typing import Any, Final
+
+from collections.abc import Iterable, Sequence
+
+from ast import literal_eval
+import argparse
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+import heapq
+from itertools import pairwise
+from math import inf
+import operator
+from pathlib import Path
+
+from attrs import define, field, frozen
+from hpl.ast import HplExpression, HplPredicate, HplProperty
+from hpl.parser import property_parser, specification_parser
+
+from hplrv.gen import MonitorGenerator
+from hplrv.monitors import MonitorState
+from hplrv.play import import_trace_from_json_file, print_monitor_failure, print_monitor_success
+from hplrv.traces import Trace
+
+np: Any
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+###############################################################################
+# Constants
+###############################################################################
+
+PROG_CHECK: Final[str] = 'hpl-rv check'
+
+BINARY_OPERATORS: Final[dict[str, Any]] = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '**': operator.pow,
+    '=': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+# NumPy integers wrap around on overflow, unlike Python integers
+ARITHMETIC_OPERATORS: Final[frozenset[str]] = frozenset(('+', '-', '*', '/', '**'))
+
+# only functions whose NumPy results match the `math` module bit by bit
+FUNCTIONS: Final[dict[str, str]] = {
+    'abs': 'abs',
+    'sqrt': 'sqrt',
+    'ceil': 'ceil',
+    'floor': 'floor',
+    'max': 'maximum',
+    'min': 'minimum',
+}
+
+###############################################################################
+# Data Structures
+###############################################################################
+
+
+class NotVectorizable(Exception):
+    pass
+
+
+@define
+class TopicColumns:
+    topic: str
+    timestamps: Any  # np.ndarray of float
+    sequence: Any  # np.ndarray of int, position of each message in the trace
+    messages: list[Any]
+    _columns: dict[tuple[str, ...], Any] = field(factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def column(self, path: tuple[str, ...]) -> Any:
+        # raises NotVectorizable if some message lacks the field
+        array = self._columns.get(path)
+        if array is None:
+            values = []
+            try:
+                for msg in self.messages:
+                    for name in path:
+                        msg = getattr(msg, name)
+                    values.append(msg)
+            except AttributeError:
+                raise NotVectorizable(f'missing field: {".".join(path)}')
+            array = _to_array(values)
+            self._columns[path] = array
+        return array
+
+
+@frozen
+class ColumnarTrace:
+    topics: dict[str, TopicColumns]
+    end_time: float
+
+    @classmethod
+    def from_trace(cls, trace: Trace) -> 'ColumnarTrace':
+        stamps: dict[str, list[float]] = {}
+        sequence: dict[str, list[int]] = {}
+        messages: dict[str, list[Any]] = {}
+        i = 0
+        for event in trace.events:
+            for msg in event.messages:
+                stamps.setdefault(msg.topic, []).append(event.timestamp)
+                sequence.setdefault(msg.topic, []).append(i)
+                messages.setdefault(msg.topic, []).append(msg.data)
+                i += 1
+        topics = {
+            name: TopicColumns(
+                name,
+                np.asarray(stamps[name], dtype=float),
+                np.asarray(sequence[name], dtype=int),
+                messages[name],
+            )
+            for name in messages
+        }
+        end_time = trace.events[-1].timestamp if trace.events else 0.0
+        return cls(topics, end_time)
+
+    @property
+    def size(self) -> int:
+        # one past the last position of a message in the trace
+        return max((int(c.sequence[-1]) + 1 for c in self.topics.values() if len(c)), default=0)
+
+    def between(
+        self,
+        start: int,
+        stop: int,
+        topics: Iterable[str] | None = None,
+    ) -> 'ColumnarTrace':
+        # messages in positions [start, stop), optionally of some topics only
+        names = self.topics.keys() if topics is None else topics
+        selected = {}
+        for name in names:
+            columns = self.topics.get(name)
+            if columns is None:
+                continue
+            i, j = np.searchsorted(columns.sequence, (start, stop), side='left')
+            selected[name] = TopicColumns(
+                name,
+                columns.timestamps[i:j],
+                columns.sequence[i:j],
+                columns.messages[i:j],
+            )
+        return ColumnarTrace(selected, self.end_time)
+
+
+@frozen
+class MessageStream:
+    # messages that satisfy some predicate of their topic, in trace order
+    topics: list[TopicColumns]
+    stamps: Any  # np.ndarray of float
+    topic_ids: Any  # np.ndarray of int, index into `topics`
+    indices: Any  # np.ndarray of int, index within the topic columns
+    # positions of the messages that may trigger an event in the inactive state
+    activators: Any
+    # timestamps of all messages the monitor subscribes to, sorted
+    all_stamps: Any
+
+    @classmethod
+    def from_builder(cls, builder: Any, trace: ColumnarTrace) -> 'MessageStream':
+        topics: list[TopicColumns] = []
+        parts = []
+        all_stamps = []
+        for topic, states in builder.on_msg.items():
+            columns = trace.topics.get(str(topic))
+            if columns is None:
+                continue
+            mask = np.zeros(len(columns), dtype=bool)
+            inactive = np.zeros(len(columns), dtype=bool)
+            for state, events in states.items():
+                for event in events:
+                    m = predicate_mask(event.predicate, columns)
+                    mask |= m
+                    if state == MonitorState.INACTIVE:
+                        inactive |= m
+            indices = np.flatnonzero(mask)
+            parts.append((
+                columns.sequence[indices],
+                columns.timestamps[indices],
+                np.full(len(indices), len(topics)),
+                indices,
+                inactive[indices],
+            ))
+            all_stamps.append(columns.timestamps)
+            topics.append(columns)
+        if not parts:
+            empty = np.zeros(0, dtype=int)
+            return cls(topics, np.zeros(0), empty, empty, empty, np.zeros(0))
+        sequence, stamps, topic_ids, indices, inactive = (
+            np.concatenate(column) for column in zip(*parts)
+        )
+        order = np.argsort(sequence, kind='stable')
+        return cls(
+            topics,
+            stamps[order],
+            topic_ids[order],
+            indices[order],
+            np.flatnonzero(inactive[order]),
+            np.sort(np.concatenate(all_stamps)),
+        )
+
+    def message(self, k: int) -> tuple[float, str, Any]:
+        columns = self.topics[self.topic_ids[k]]
+        i = self.indices[k]
+        return float(self.stamps[k]), columns.topic, columns.messages[i]
+
+
+@frozen
+class OfflineVerdict:
+    monitor: Any
+    value: bool | None
+    timestamp: float | None
+    witness: list[Any]
+
+
+@frozen
+class ChunkResult:
+    value: bool | None
+    timestamp: float | None
+    witness: list[tuple[str, float, Any]]
+    # whether the monitor ended in its initial state, without pending timers
+    reset: bool
+
+
+###############################################################################
+# Interface
+###############################################################################
+
+
+def check_trace(
+    properties: Iterable[HplProperty],
+    trace: Trace,
+    jobs: int = 1,
+) -> list[OfflineVerdict]:
+    """
+    Returns the verdict of each given property over the given trace.
+    With more than one job, chunks of the trace are checked in parallel.
+    """
+    return check_columns(properties, ColumnarTrace.from_trace(trace), jobs=jobs)
+
+
+def check_columns(
+    properties: Iterable[HplProperty],
+    trace: ColumnarTrace,
+    jobs: int = 1,
+) -> list[OfflineVerdict]:
+    properties = list(properties)
+    data, namespace = _compile_library(properties)
+    man = namespace['HplMonitorManager']()
+    if jobs > 1:
+        return _check_parallel(properties, man.monitors, data, namespace['MsgRecord'], trace, jobs)
+    builders = [builder for _name, builder, _params in data['instances']]
+    verdicts = []
+    for mon, builder in zip(man.monitors, builders):
+        verdicts.append(_run_monitor(mon, builder, trace))
+    return verdicts
+
+
+def partition(
+    hpl_property: HplProperty,
+    builder: Any,
+    trace: ColumnarTrace,
+    n: int,
+) -> list[int]:
+    """
+    Returns the trace positions at which each of (at most) `n` chunks
+    starts, followed by the end position of the trace.
+    Chunks span similar time intervals, and are cut right after messages
+    that may bring the monitor back to its initial state.
+    Whether they did is only known after checking each chunk.
+    """
+    size = trace.size
+    if n <= 1 or size == 0:
+        return [0, size]
+    if builder.reentrant_scope:
+        # the end of each scope instance resets the monitor
+        cuts = _terminator_cuts(hpl_property, trace)
+    elif builder.launch_enters_scope and builder.timeout < 0:
+        # without timers, any monitored message may restore the initial state;
+        # _check_task reports whether a chunk ended in the initial state,
+        # and _stitch resumes sequentially from the first one that did not
+        cuts = [
+            (columns.timestamps, columns.sequence + 1)
+            for name, columns in trace.topics.items()
+            if name in builder.on_msg
+        ]
+    else:
+        return [0, size]
+    if not cuts:
+        return [0, size]
+    stamps, positions = (np.concatenate(column) for column in zip(*cuts))
+    order = np.argsort(positions, kind='stable')
+    stamps = stamps[order]
+    positions = positions[order]
+    if len(positions) == 0:
+        return [0, size]
+    targets = stamps[0] + (stamps[-1] - stamps[0]) * np.arange(1, n) / n
+    indices = np.searchsorted(stamps, targets, side='left')
+    bounds = np.unique(positions[indices[indices < len(positions)]])
+    bounds = [int(b) for b in bounds if 0 < b < size]
+    return [0, *bounds, size]
+
+
+def message_volume(callbacks: dict[str, Iterable[int]], trace: ColumnarTrace) -> dict[int, int]:
+    """
+    Returns the number of messages that each monitor subscribes to,
+    given the `callbacks` of `MonitorGenerator.data_for_monitor_library`.
+    """
+    volume: dict[int, int] = {}
+    for topic, indices in callbacks.items():
+        columns = trace.topics.get(str(topic))
+        n = 0 if columns is None else len(columns)
+        for i in indices:
+            volume[i] = volume.get(i, 0) + n
+    return volume
+
+
+def balance(weights: Sequence[int], n: int) -> list[list[int]]:
+    """
+    Splits the indices of the given weights into at most `n` groups of
+    similar total weight, heaviest first (longest processing time rule).
+    """
+    heap: list[tuple[int, int, list[int]]] = [(0, k, []) for k in range(min(n, len(weights)))]
+    for i in sorted(range(len(weights)), key=lambda i: weights[i], reverse=True):
+        total, k, group = heapq.heappop(heap)
+        group.append(i)
+        heapq.heappush(heap, (total + weights[i], k, group))
+    return [sorted(group) for _total, _k, group in sorted(heap, key=lambda item: item[1])]
+
+
+def predicate_mask(predicate: HplPredicate, columns: TopicColumns) -> Any:
+    """
+    Returns a boolean array of the messages that may satisfy the predicate.
+    Predicates that cannot be vectorized keep all messages.
+    """
+    mask = _exact_mask(predicate, columns)
+    if mask is None:
+        return np.ones(len(columns), dtype=bool)
+    return mask
+
+
+###############################################################################
+# Parallel Execution
+###############################################################################
+
+
+def _check_parallel(
+    properties: list[HplProperty],
+    monitors: list[Any],
+    data: dict[str, Any],
+    record: type,
+    trace: ColumnarTrace,
+    jobs: int,
+) -> list[OfflineVerdict]:
+    builders = [builder for _name, builder, _params in data['instances']]
+    # per property: chunk bounds and (future, index within the task) pairs
+    plans: dict[int, tuple[list[int], list[tuple[Future[Any], int]]]] = {}
+    whole = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for i, (hpl_property, builder) in enumerate(zip(properties, builders)):
+            bounds = partition(hpl_property, builder, trace, jobs)
+            if len(bounds) <= 2:
+                whole.append(i)
+                continue
+            topics = [str(topic) for topic in builder.on_msg]
+            tasks = []
+            for lo, hi in pairwise(bounds):
+                chunk = trace.between(lo, hi, topics)
+                future = pool.submit(_check_task, (hpl_property,), chunk, hi == bounds[-1])
+                tasks.append((future, 0))
+            plans[i] = (bounds, tasks)
+        volume = message_volume(data['callbacks'], trace)
+        for shard in balance([volume.get(i, 0) for i in whole], jobs):
+            indices = [whole[k] for k in shard]
+            shard_topics = {str(topic) for i in indices for topic in builders[i].on_msg}
+            task = tuple(properties[i] for i in indices)
+            chunk = trace.between(0, trace.size, shard_topics)
+            future = pool.submit(_check_task, task, chunk, True)
+            for j, i in enumerate(indices):
+                plans[i] = ([0, trace.size], [(future, j)])
+        return [
+            _stitch(mon, builder, *plans[i], record, trace)
+            for i, (mon, builder) in enumerate(zip(monitors, builders))
+        ]
+
+
+def _stitch(
+    mon: Any,
+    builder: Any,
+    bounds: list[int],
+    tasks: list[tuple[Future[Any], int]],
+    record: type,
+    trace: ColumnarTrace,
+) -> OfflineVerdict:
+    # every chunk starts from the initial state while the previous ones
+    # end in it, which is what a sequential run would go through
+    for i, (future, j) in enumerate(tasks):
+        chunk = future.result()[j]
+        if chunk.value is not None or i == len(tasks) - 1:
+            witness = [record(*rec) for rec in chunk.witness]
+            return OfflineVerdict(mon, chunk.value, chunk.timestamp, witness)
+        if not chunk.reset:
+            # the monitor carries state into the next chunk
+            for other, _j in tasks[i + 1:]:
+                other.cancel()
+            return _run_monitor(mon, builder, trace.between(bounds[i], bounds[-1]))
+    raise ValueError('no chunks to stitch')
+
+
+def _check_task(
+    properties: tuple[HplProperty, ...],
+    trace: ColumnarTrace,
+    final: bool,
+) -> list[ChunkResult]:
+    manager, builders = _worker_library(properties)
+    results = []
+    for mon, builder in zip(manager().monitors, builders):
+        verdict = _run_monitor(mon, builder, trace, final=final)
+        reset = (
+            mon._state == builder.initial_state.value
+            and not mon.witness
+            and not getattr(mon, '_pool', None)
+            and mon.deadline == inf
+        )
+        witness = [tuple(rec) for rec in verdict.witness]
+        results.append(ChunkResult(verdict.value, verdict.timestamp, witness, reset))
+    return results
+
+
+@lru_cache(maxsize=None)
+def _worker_library(properties: tuple[HplProperty, ...]) -> tuple[type, list[Any]]:
+    # worker processes compile each group of properties once
+    data, namespace = _compile_library(list(properties))
+    builders = [builder for _name, builder, _params in data['instances']]
+    return namespace['HplMonitorManager'], builders
+
+
+def _terminator_cuts(hpl_property: HplProperty, trace: ColumnarTrace) -> list[tuple[Any, Any]]:
+    # messages that surely satisfy a terminator and cannot be activators
+    activator = hpl_property.scope.activator
+    cuts = []
+    for event in hpl_property.scope.terminator.simple_events():
+        columns = trace.topics.get(str(event.name))
+        if columns is None:
+            continue
+        mask = _exact_mask(event.predicate, columns)
+        if mask is None:
+            continue
+        for other in activator.simple_events():
+            if str(other.name) == columns.topic:
+                mask = mask & ~predicate_mask(other.predicate, columns)
+        cuts.append((columns.timestamps[mask], columns.sequence[mask] + 1))
+    return cuts
+
+
+###############################################################################
+# Monitor Execution
+###############################################################################
+
+
+def _compile_library(properties: list[HplProperty]) -> tuple[dict[str, Any], dict[str, Any]]:
+    gen = MonitorGenerator(live_server=False, share_classes=False, deadlines=True)
+    data = gen.data_for_monitor_library(properties)
+    code = gen.renderer.render_template('py/library.py.jinja', data)
+    namespace: dict[str, Any] = {}
+    exec(compile(code, f'<{PROG_CHECK}>', 'exec'), namespace)
+    return data, namespace
+
+
+def _run_monitor(
+    mon: Any,
+    builder: Any,
+    trace: ColumnarTrace,
+    final: bool = True,
+) -> OfflineVerdict:
+    result = {}
+
+    def on_verdict(stamp, witness):
+        result['timestamp'] = stamp
+
+    mon.on_success = on_verdict
+    mon.on_violation = on_verdict
+    stream = MessageStream.from_builder(builder, trace)
+    mon.on_launch(0.0)
+    k = 0
+    n = len(stream.stamps)
+    while k < n:
+        if mon.is_inactive_state:
+            # outside of the scope, only activators matter and there are no
+            # timeouts, so jump straight to the next candidate activator
+            j = np.searchsorted(stream.activators, k, side='left')
+            if j >= len(stream.activators):
+                break
+            k = int(stream.activators[j])
+        stamp, topic, msg = stream.message(k)
+        _fire_timeouts(mon, stream.all_stamps, stamp)
+        mon.cb_map[topic](msg, stamp)
+        if mon.verdict is not None:
+            break
+        k += 1
+    if final and mon.verdict is None:
+        _fire_timeouts(mon, stream.all_stamps, trace.end_time)
+        if mon.verdict is None and mon.deadline <= trace.end_time:
+            mon.on_timer(trace.end_time)
+    return OfflineVerdict(mon, mon.verdict, result.get('timestamp'), list(mon.witness))
+
+
+def _fire_timeouts(mon: Any, all_stamps: Any, stamp: float) -> None:
+    # timeouts fire upon the first message of the monitor at or after the
+    # deadline, as they would if the monitor received every message
+    deadline = mon.deadline
+    while deadline <= stamp:
+        i = np.searchsorted(all_stamps, deadline, side='left')
+        if i >= len(all_stamps) or all_stamps[i] > stamp:
+            return
+        mon.on_timer(float(all_stamps[i]))
+        if mon.deadline == deadline:
+            return
+        deadline = mon.deadline
+
+
+###############################################################################
+# Vectorized Predicates
+###############################################################################
+
+
+def _exact_mask(predicate: HplPredicate, columns: TopicColumns) -> Any:
+    # returns None if the predicate cannot be vectorized
+    n = len(columns)
+    if predicate.is_vacuous:
+        return np.full(n, predicate.is_true, dtype=bool)
+    try:
+        with np.errstate(all='ignore'):
+            mask = _vector(predicate.condition, columns)
+        return np.broadcast_to(np.asarray(mask, dtype=bool), (n,))
+    except (NotVectorizable, OverflowError, TypeError, ValueError):
+        return None
+
+
+def _vector(expr: HplExpression, columns: TopicColumns) -> Any:
+    if expr.is_value:
+        if expr.is_literal:
+            return _literal_value(expr)
+        raise NotVectorizable(str(expr))
+    if expr.is_accessor:
+        return columns.column(_field_path(expr))
+    if expr.is_operator:
+        if expr.arity == 1:
+            return _unary_op(expr, columns)
+        return _binary_op(expr, columns)
+    if expr.is_function_call:
+        name = FUNCTIONS.get(expr.function.name)
+        if name is None:
+            raise NotVectorizable(str(expr))
+        args = [_vector(arg, columns) for arg in expr.arguments]
+        if name == 'abs':
+            _check_exact_arithmetic(*args)
+        return getattr(np, name)(*args)
+    raise NotVectorizable(str(expr))
+
+
+def _unary_op(op: HplExpression, columns: TopicColumns) -> Any:
+    a = _vector(op.operand, columns)
+    if op.operator.token == '-':
+        _check_exact_arithmetic(a)
+        return np.negative(a)
+    return np.logical_not(a)
+
+
+def _binary_op(op: HplExpression, columns: TopicColumns) -> Any:
+    token = op.operator.token
+    if token == 'in':
+        return _inclusion(op, columns)
+    a = _vector(op.operand1, columns)
+    b = _vector(op.operand2, columns)
+    if token == 'and':
+        return np.logical_and(a, b)
+    if token == 'or':
+        return np.logical_or(a, b)
+    if token == 'implies':
+        return np.logical_or(np.logical_not(a), b)
+    if token == 'iff':
+        return np.equal(a, b)
+    if token in ARITHMETIC_OPERATORS:
+        _check_exact_arithmetic(a, b)
+    return BINARY_OPERATORS[token](a, b)
+
+
+def _check_exact_arithmetic(*operands: Any) -> None:
+    # integer (and boolean) results are left to the monitors,
+    # floating point results are the same as in Python
+    if np.result_type(*operands).kind in 'biu':
+        raise NotVectorizable('integer arithmetic')
+
+
+def _inclusion(op: HplExpression, columns: TopicColumns) -> Any:
+    a = _vector(op.operand1, columns)
+    values = op.operand2
+    if values.is_value and values.is_range:
+        lb = _vector(values.min_value, columns)
+        ub = _vector(values.max_value, columns)
+        low = (a > lb) if values.exclude_min else (a >= lb)
+        high = (a < ub) if values.exclude_max else (a <= ub)
+        return np.logical_and(low, high)
+    if values.is_value and values.is_set:
+        if all(v.is_value and v.is_literal for v in values.values):
+            return np.isin(a, [_literal_value(v) for v in values.values])
+    raise NotVectorizable(str(op))
+
+
+def _literal_value(expr: HplExpression) -> Any:
+    value = expr.value
+    if isinstance(value, str):
+        # string literals keep their quotes, as they are rendered into code
+        return literal_eval(str(value))
+    return value
+
+
+def _field_path(expr: HplExpression) -> tuple[str, ...]:
+    path = []
+    while expr.is_accessor:
+        if not expr.is_field:
+            raise NotVectorizable(str(expr))
+        path.append(str(expr.field))
+        expr = expr.message
+    if not (expr.is_value and expr.is_reference and expr.is_this_msg):
+        raise NotVectorizable(str(expr))
+    return tuple(reversed(path))
+
+
+def _to_array(values: Sequence[Any]) -> Any:
+    array = np.asarray(values)
+    if array.ndim != 1 or array.dtype.kind not in 'biufU':
+        array = np.empty(len(values), dtype=object)
+        array[:] = values
+    return array
+
+
+###############################################################################
+# Entry Point
+###############################################################################
+
+
+def subprogram(
+    argv: list[str] | None,
+    _settings: dict[str, Any] | None = None,
+) -> int:
+    args = parse_arguments(argv)
+    return run(args, _settings or {})
+
+
+def run(args: dict[str, Any], _settings: dict[str, Any]) -> int:
+    if np is None:
+        print(f'{PROG_CHECK}: requires numpy (pip install hpl-rv[numpy])')
+        return 1
+    properties: list[HplProperty] = []
+    if args.get('files'):
+        parser = specification_parser()
+        for input_path in args['args']:
+            text: str = Path(input_path).read_text(encoding='utf-8').strip()
+            properties.extend(parser.parse(text).properties)
+    else:
+        parser = property_parser()
+        properties.extend(parser.parse(text) for text in args['args'])
+    trace: Trace = import_trace_from_json_file(args['data'].resolve(strict=True))
+    for verdict in check_trace(properties, trace, jobs=args['jobs']):
+        if verdict.value is True:
+            print_monitor_success(verdict.monitor, verdict.timestamp, verdict.witness)
+        elif verdict.value is False:
+            print_monitor_failure(verdict.monitor, verdict.timestamp, verdict.witness)
+        else:
+            print('> Undecided')
+            print(f'  [HPL]: {verdict.monitor.HPL_PROPERTY}')
+    return 0
+
+
+###############################################################################
+# Argument Parsing
+###############################################################################
+
+
+def parse_arguments(argv: list[str] | None) -> dict[str, Any]:
+    description = 'Check recorded message traces against HPL properties.'
+    parser = argparse.ArgumentParser(prog=PROG_CHECK, description=description)
+
+    parser.add_argument(
+        '-d',
+        '--data',
+        type=Path,
+        required=True,
+        help='path to a data file containing a message trace',
+    )
+
+    parser.add_argument(
+        '-f',
+        '--files',
+        action='store_true',
+        help='process args as HPL files (default: HPL properties)',
+    )
+
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        default=1,
+        help='number of processes to check chunks of the trace (default: 1)',
+    )
+
+    parser.add_argument('args', nargs='+', help='input properties')
+
+    args = parser.parse_args(args=argv)
+    return vars(args)
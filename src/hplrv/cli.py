@@ -21,19 +21,34 @@ Some of the structure of this file came from this StackExchange question:
 from typing import Any, Final
 
 import argparse
+from importlib import import_module
 import sys
 from traceback import print_exc
 
-from hplrv import __version__ as current_version, gen, gui, play
+from hplrv import __version__ as current_version
 
 ###############################################################################
 # Constants
 ###############################################################################
 
 PROG: Final[str] = 'hpl-rv'
+CMD_BENCH: Final[str] = 'bench'
+CMD_CHECK: Final[str] = 'check'
 CMD_GEN: Final[str] = 'gen'
 CMD_GUI: Final[str] = 'gui'
 CMD_PLAY: Final[str] = 'play'
+CMD_SYNTH: Final[str] = 'synth'
+
+# subcommand modules are imported only when they run;
+# some of them pull in heavy dependencies (e.g., gevent)
+SUBPROGRAMS: Final[dict[str, str]] = {
+    CMD_BENCH: 'hplrv.bench',
+    CMD_CHECK: 'hplrv.check',
+    CMD_GEN: 'hplrv.gen',
+    CMD_GUI: 'hplrv.gui',
+    CMD_PLAY: 'hplrv.play',
+    CMD_SYNTH: 'hplrv.synth',
+}
 
 ###############################################################################
 # Argument Parsing
@@ -54,7 +69,7 @@ def parse_arguments(argv: list[str] | None) -> dict[str, Any]:
     parser.add_argument(
         'cmd',
         metavar='CMD',
-        choices=[CMD_GEN, CMD_GUI, CMD_PLAY],
+        choices=list(SUBPROGRAMS),
         help=f'a {PROG} command to run',
     )
 
@@ -69,6 +84,23 @@ def parse_arguments(argv: list[str] | None) -> dict[str, Any]:
     return vars(args)
 
 
+# argparse types shared by the subcommands
+
+
+def positive_float(text: str) -> float:
+    value = float(text)
+    if not 0.0 < value < float('inf'):
+        raise argparse.ArgumentTypeError(f'expected a positive number: {text}')
+    return value
+
+
+def positive_int(text: str) -> int:
+    value = int(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f'expected a positive integer: {text}')
+    return value
+
+
 ###############################################################################
 # Setup
 ###############################################################################
@@ -108,12 +140,9 @@ def main(argv: list[str] | None = None) -> int:
         config = load_configs(args)
         cmd: str = args['cmd']
 
-        if cmd == CMD_GEN:
-            return gen.subprogram(args.get('args'), config)
-        if cmd == CMD_GUI:
-            return gui.subprogram(args.get('args'), config)
-        if cmd == CMD_PLAY:
-            return play.subprogram(args.get('args'), config)
+        module = import_module(SUBPROGRAMS[cmd])
+        exit_code: int = module.subprogram(args.get('args'), config)
+        return exit_code
 
     except KeyboardInterrupt:
         print('Aborted manually.', file=sys.stderr)
@@ -124,5 +153,3 @@ def main(argv: list[str] | None = None) -> int:
         print(err)
         print_exc()
         return 1
-
-    return 0  # success
@@ -5,7 +5,7 @@
 //  Constants
 // -----------------------------------------------------------------------------
 
-const { createApp } = Vue;
+const { createApp, markRaw, toRaw } = Vue;
 
 const PROPERTY_KEYWORDS = [
   /(^|\s)(globally)(\s*:)/ig,
@@ -36,6 +36,24 @@ const NUMBER_REGEX = /(\D)(\d*\.?\d+)(\D)/g;
 const STRING_REGEX = /("(?:\\?[\S\s])*?")/g;
 const BOOLEAN_REGEX = /(\W)(true|false)(\W)/ig;
 
+// property text -> highlighted HTML; properties do not change at runtime
+const HIGHLIGHT_CACHE = new Map();
+
+// the monitor list only renders the rows in view; rows have a fixed height
+const MONITOR_ROW_HEIGHT = 72;  // px, must match `.monitor-list .tracked-monitor`
+const MONITOR_ROW_OVERSCAN = 8;  // rows rendered above and below the view
+
+// subscription filters sent to the backend
+const VERDICT_FILTERS = {
+  all: null,
+  failure: [false],
+  pending: [null],
+  success: [true],
+};
+
+// failures first when grouping by verdict
+const VERDICT_ORDER = { false: 0, null: 1, true: 2 };
+
 // -----------------------------------------------------------------------------
 //  Utility
 // -----------------------------------------------------------------------------
@@ -67,17 +85,47 @@ async function postData(url = "", data = {}) {
 }
 
 
-function padWithMonitors(monitors, n) {
-  while (monitors.length < n) {
-    const i = monitors.length + 1;
-    monitors.push({
-      id: `p${i}`,
-      title: `Property ${i}`,
-      property: "",
-      verdict: null,
-      witness: [],
-    });
+function highlightProperty(property) {
+  const cached = HIGHLIGHT_CACHE.get(property);
+  if (cached != null) { return cached }
+  // replace predicates with placeholders
+  let p = property.replace(PREDICATE_REGEX, "$1{}");
+  // bolden keywords in the scope and pattern structures
+  for (const re of PROPERTY_KEYWORDS) {
+    p = p.replace(re, "$1<b>$2</b>$3");
+  }
+  // colorize channel names
+  p = p.replace(CHANNEL_REGEX, '$1<span class="special">$2</span>$3');
+  // handle predicates
+  const matches = [...property.matchAll(PREDICATE_REGEX)];
+  for (const match of matches) {
+    let predicate = match[2];
+    // replace strings with placeholders
+    const strings = [...predicate.matchAll(STRING_REGEX)];
+    predicate = predicate.replace(STRING_REGEX, '""');
+    // bolden predicate keywords
+    for (const re of PREDICATE_KEYWORDS) {
+      predicate = predicate.replace(re, "$1<b>$2</b>$3");
+    }
+    // colorize booleans
+    predicate = predicate.replace(BOOLEAN_REGEX, '$1<span class="bool">$2</span>$3');
+    // put colorized strings back in place
+    for (const s of strings) {
+      // replace just one string at a time, in order
+      predicate = predicate.replace('""', `<span class="string">${s[0]}</span>`);
+    }
+    // replace just one predicate at a time in the global property
+    p = p.replace("{}", predicate);
   }
+  // colorize numbers
+  p = p.replace(NUMBER_REGEX, '$1<span class="number">$2</span>$3');
+  HIGHLIGHT_CACHE.set(property, p);
+  return p;
+}
+
+
+function serverAddress(server) {
+  return `${server.host}:${server.port}`;
 }
 
 
@@ -196,9 +244,9 @@ const LiveServer = {
   props: {
     host: String,
     port: Number,
-    monitors: {
-      type: Array,
-      default(_rawProps) { return [] }
+    summary: {
+      type: Object,
+      default(_rawProps) { return { monitors: 0, success: 0, failure: 0 } }
     },
     isSelected: Boolean,
     isOnline: Boolean,
@@ -206,7 +254,7 @@ const LiveServer = {
 
   computed: {
     numMonitors() {
-      const n = this.monitors.length;
+      const n = this.summary.monitors;
       return n === 1 ? "1 monitor" : `${n} monitors`;
     },
 
@@ -241,20 +289,84 @@ const LiveServer = {
 const RuntimeMonitorList = {
   template: "#vue-runtime-monitor-list",
 
-  emits: ["show-witness"],
+  emits: ["show-witness", "filter-verdict"],
 
   props: {
     monitors: {
       type: Array,
       default(_rawProps) { return [] },
-    }
+    },
+    verdictFilter: {
+      type: String,
+      default: "all",
+    },
+  },
+
+  data() {
+    return {
+      grouped: false,
+      scrollTop: 0,
+      viewportHeight: 0,
+    };
+  },
+
+  computed: {
+    rows() {
+      if (!this.grouped) { return this.monitors }
+      return [...this.monitors].sort((a, b) => (
+        VERDICT_ORDER[a.verdict] - VERDICT_ORDER[b.verdict] || a.index - b.index
+      ));
+    },
+
+    firstRow() {
+      const i = Math.floor(this.scrollTop / MONITOR_ROW_HEIGHT);
+      return Math.max(0, i - MONITOR_ROW_OVERSCAN);
+    },
+
+    lastRow() {
+      const i = Math.ceil((this.scrollTop + this.viewportHeight) / MONITOR_ROW_HEIGHT);
+      return Math.min(this.rows.length, i + MONITOR_ROW_OVERSCAN);
+    },
+
+    visibleRows() {
+      return this.rows.slice(this.firstRow, this.lastRow);
+    },
+
+    listStyle() {
+      // the list keeps its full height, so that the scroll bar is right
+      return {
+        height: `${this.rows.length * MONITOR_ROW_HEIGHT}px`,
+        paddingTop: `${this.firstRow * MONITOR_ROW_HEIGHT}px`,
+      };
+    },
   },
 
   methods: {
-    showWitness(witness) {
-      this.$emit("show-witness", witness);
-    }
-  }
+    showWitness(index) {
+      this.$emit("show-witness", index);
+    },
+
+    onScroll() {
+      const viewport = this.$refs.viewport;
+      this.scrollTop = viewport.scrollTop;
+      this.viewportHeight = viewport.clientHeight;
+    },
+
+    onFilterChange(event) {
+      this.$refs.viewport.scrollTop = 0;
+      this.$emit("filter-verdict", event.target.value);
+    },
+  },
+
+  mounted() {
+    this.resizeObserver = new ResizeObserver(() => this.onScroll());
+    this.resizeObserver.observe(this.$refs.viewport);
+    this.onScroll();
+  },
+
+  beforeUnmount() {
+    this.resizeObserver.disconnect();
+  },
 };
 
 
@@ -264,46 +376,15 @@ const RuntimeMonitor = {
   emits: ["show-witness"],
 
   props: {
+    index: Number,
     title: String,
     property: String,
     verdict: Boolean,
-    witness: Array,
   },
 
   computed: {
     propertyHTML() {
-      // replace predicates with placeholders
-      let p = this.property.replace(PREDICATE_REGEX, "$1{}");
-      // bolden keywords in the scope and pattern structures
-      for (const re of PROPERTY_KEYWORDS) {
-        p = p.replace(re, "$1<b>$2</b>$3");
-      }
-      // colorize channel names
-      p = p.replace(CHANNEL_REGEX, '$1<span class="special">$2</span>$3');
-      // handle predicates
-      const matches = [...this.property.matchAll(PREDICATE_REGEX)];
-      for (const match of matches) {
-        let predicate = match[2];
-        // replace strings with placeholders
-        const strings = [...predicate.matchAll(STRING_REGEX)];
-        predicate = predicate.replace(STRING_REGEX, '""');
-        // bolden predicate keywords
-        for (const re of PREDICATE_KEYWORDS) {
-          predicate = predicate.replace(re, "$1<b>$2</b>$3");
-        }
-        // colorize booleans
-        predicate = predicate.replace(BOOLEAN_REGEX, '$1<span class="bool">$2</span>$3');
-        // put colorized strings back in place
-        for (const s of strings) {
-          // replace just one string at a time, in order
-          predicate = predicate.replace('""', `<span class="string">${s[0]}</span>`);
-        }
-        // replace just one predicate at a time in the global property
-        p = p.replace("{}", predicate);
-      }
-      // colorize numbers
-      p = p.replace(NUMBER_REGEX, '$1<span class="number">$2</span>$3');
-      return p;
+      return highlightProperty(this.property);
     },
 
     statusClass() {
@@ -321,8 +402,8 @@ const RuntimeMonitor = {
 
   methods: {
     showWitness() {
-      if (this.witness == null) { return }
-      this.$emit("show-witness", this.witness);
+      if (this.verdict == null) { return }
+      this.$emit("show-witness", this.index);
     }
   }
 };
@@ -340,6 +421,7 @@ const app = createApp({
       openModals: 0,
       servers: [],
       selectedServer: null,
+      verdictFilter: "all",
       websocket: null,
     };
   },
@@ -353,7 +435,8 @@ const app = createApp({
       if (this.selectedServer == null) { return [] }
       const server = this.servers[this.selectedServer];
       if (server == null) { return [] }
-      return server.monitors;
+      // integer keys are iterated in ascending order
+      return Object.values(server.monitors);
     }
   },
 
@@ -367,6 +450,7 @@ const app = createApp({
         if (server.port !== port) { continue }
         this.selectedServer = i;
         // this.displayedMonitors = server.monitors;
+        this.subscribe();
         return;
       }
     },
@@ -392,6 +476,7 @@ const app = createApp({
           // removed one above the selected; shift by one
           this.selectedServer--;
         }
+        this.subscribe();
 
         if (this.servers.length === 0 && this.websocket != null) {
           this.websocket.close();
@@ -402,8 +487,14 @@ const app = createApp({
       }
     },
 
-    showWitnessDialog(witness) {
-      this.$refs.witnessDialog.show(witness);
+    showWitnessDialog(index) {
+      // witnesses are not part of the live updates; fetch on demand
+      const server = this.servers[this.selectedServer];
+      if (server == null) { return }
+      fetch(`/witness/${serverAddress(server)}/${index}`)
+      .then(response => response.json())
+      .then(data => this.$refs.witnessDialog.show(data.witness))
+      .catch((reason) => alert(`Error: ${reason}`));
     },
 
     showConnectionDialog() {
@@ -417,7 +508,12 @@ const app = createApp({
         self.servers = [];
         for (const server of data.servers) {
           console.log("register new live server", server);
-          self.servers.push({ host: server.host, port: server.port, monitors: [] });
+          self.servers.push({
+            host: server.host,
+            port: server.port,
+            monitors: markRaw({}),
+            summary: { monitors: 0, success: 0, failure: 0 },
+          });
         }
         if (self.servers.length > 0) {
           self.selectedServer = 0;
@@ -426,7 +522,10 @@ const app = createApp({
         if (self.websocket == null) {
           self.websocket = new WebSocket(`ws://${window.location.host}/ws`);
           self.websocket.onmessage = event => self.onMonitorUpdate(JSON.parse(event.data));
+          self.websocket.onopen = () => self.subscribe();
           self.websocket.onclose = () => { self.websocket = null };
+        } else {
+          self.subscribe();
         }
       })
       .catch((reason) => alert(`Error: ${reason}`));
@@ -436,16 +535,45 @@ const app = createApp({
       console.log("disconnected");
     },
 
-    onMonitorUpdate(msg) {
-      console.log("message from live server", msg);
-      for (const server of this.servers) {
-        const addr = `${server.host}:${server.port}`;
-        if (addr !== msg.server) { continue }
+    onVerdictFilter(value) {
+      this.verdictFilter = value;
+      this.subscribe();
+    },
 
-        const i = msg.id;
-        padWithMonitors(server.monitors, i+1);
-        server.monitors[i] = msg.monitor;
-        return;
+    subscribe() {
+      // only receive the monitors that are displayed
+      if (this.websocket == null) { return }
+      if (this.websocket.readyState !== WebSocket.OPEN) { return }
+      const server = this.servers[this.selectedServer];
+      const servers = server == null ? [] : [serverAddress(server)];
+      const verdicts = VERDICT_FILTERS[this.verdictFilter];
+      this.websocket.send(JSON.stringify({ subscribe: { servers, verdicts } }));
+    },
+
+    onMonitorUpdate(frame) {
+      // frames are either a full "snapshot" or a "delta" since the last frame
+      for (const server of this.servers) {
+        const addr = serverAddress(server);
+        const summary = frame.summary[addr];
+        if (summary != null) {
+          server.summary = summary;
+        }
+        const entries = frame.servers[addr];
+        if (entries == null) {
+          if (frame.type === "snapshot") { server.monitors = markRaw({}) }
+          continue;
+        }
+        // apply the whole batch to a plain copy, then swap it in at once,
+        // so that there is a single reactive update per frame
+        const monitors = frame.type === "snapshot" ? {} : { ...toRaw(server.monitors) };
+        for (const [i, monitor] of entries) {
+          if (monitor == null) {
+            delete monitors[i];
+          } else {
+            monitors[i] = { index: i, ...monitor };
+          }
+        }
+        server.monitors = markRaw(monitors);
       }
     },
 
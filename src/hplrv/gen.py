@@ -36,6 +36,8 @@ from hplrv.monitors import (
 
 PROG_GEN: Final[str] = 'hpl-rv gen'
 
+DEFAULT_EVICT_AFTER: Final[float] = 60.0
+
 type ANY_PATH = Path | str
 type ANY_SPEC = HplSpecification | str
 type ANY_PROP = HplProperty | str
@@ -45,13 +47,17 @@ type ANY_PROP = HplProperty | str
 ###############################################################################
 
 
-def monitors_from_files(paths: list[ANY_PATH], lang: str = 'py') -> list[str]:
+def monitors_from_files(
+    paths: list[ANY_PATH],
+    lang: str = 'py',
+    optimization: int = 0,
+) -> list[str]:
     """
     Produces a list of monitor code snippets,
     given a list of paths to HPL files with specifications.
     """
     parser = specification_parser()
-    r = MonitorGenerator(lang=lang)
+    r = MonitorGenerator(lang=lang, optimization=optimization)
     outputs: list[str] = []
     for input_path in paths:
         path: Path = Path(input_path).resolve(strict=True)
@@ -62,13 +68,34 @@ def monitors_from_files(paths: list[ANY_PATH], lang: str = 'py') -> list[str]:
     return outputs
 
 
-def lib_from_files(paths: list[ANY_PATH], lang: str = 'py') -> str:
+def lib_from_files(
+    paths: list[ANY_PATH],
+    lang: str = 'py',
+    live_server: bool = True,
+    share_classes: bool = False,
+    key_field: str | None = None,
+    evict_after: float | None = DEFAULT_EVICT_AFTER,
+    vectorized: bool = False,
+    instrument: bool = False,
+    metrics: bool = False,
+    optimization: int = 0,
+) -> str:
     """
     Produces a self-contained library of monitors,
     given a list of paths to HPL files with specifications.
     """
     parser = specification_parser()
-    r = MonitorGenerator(lang=lang)
+    r = MonitorGenerator(
+        lang=lang,
+        live_server=live_server,
+        share_classes=share_classes,
+        key_field=key_field,
+        evict_after=evict_after,
+        vectorized=vectorized,
+        instrument=instrument,
+        metrics=metrics,
+        optimization=optimization,
+    )
     properties: list[HplProperty] = []
     for input_path in paths:
         path: Path = Path(input_path).resolve(strict=True)
@@ -78,7 +105,11 @@ def lib_from_files(paths: list[ANY_PATH], lang: str = 'py') -> str:
     return r.monitor_library(properties)
 
 
-def monitors_from_spec(spec: ANY_SPEC, lang: str = 'py') -> list[str]:
+def monitors_from_spec(
+    spec: ANY_SPEC,
+    lang: str = 'py',
+    optimization: int = 0,
+) -> list[str]:
     """
     Produces a list of monitor code snippets,
     given an HPL specification.
@@ -86,14 +117,25 @@ def monitors_from_spec(spec: ANY_SPEC, lang: str = 'py') -> list[str]:
     if not isinstance(spec, HplSpecification):
         parser = specification_parser()
         spec = parser.parse(spec)
-    r = MonitorGenerator(lang=lang)
+    r = MonitorGenerator(lang=lang, optimization=optimization)
     outputs: list[str] = []
     for hpl_property in spec.properties:
         outputs.append(r.monitor_class(hpl_property))
     return outputs
 
 
-def lib_from_spec(spec: ANY_SPEC, lang: str = 'py') -> str:
+def lib_from_spec(
+    spec: ANY_SPEC,
+    lang: str = 'py',
+    live_server: bool = True,
+    share_classes: bool = False,
+    key_field: str | None = None,
+    evict_after: float | None = DEFAULT_EVICT_AFTER,
+    vectorized: bool = False,
+    instrument: bool = False,
+    metrics: bool = False,
+    optimization: int = 0,
+) -> str:
     """
     Produces a self-contained library of monitors,
     given an HPL specification.
@@ -101,28 +143,46 @@ def lib_from_spec(spec: ANY_SPEC, lang: str = 'py') -> str:
     if not isinstance(spec, HplSpecification):
         parser = specification_parser()
         spec = parser.parse(spec)
-    r = MonitorGenerator(lang=lang)
+    r = MonitorGenerator(
+        lang=lang,
+        live_server=live_server,
+        share_classes=share_classes,
+        key_field=key_field,
+        evict_after=evict_after,
+        vectorized=vectorized,
+        instrument=instrument,
+        metrics=metrics,
+        optimization=optimization,
+    )
     return r.monitor_library(spec.properties)
 
 
-def monitor_from_property(property: ANY_PROP, lang: str = 'py') -> str:
+def monitor_from_property(
+    property: ANY_PROP,
+    lang: str = 'py',
+    optimization: int = 0,
+) -> str:
     """
     Produces a monitor code snippet, given an HPL property.
     """
     if not isinstance(property, HplProperty):
         parser = property_parser()
         property = parser.parse(property)
-    r = MonitorGenerator(lang=lang)
+    r = MonitorGenerator(lang=lang, optimization=optimization)
     return r.monitor_class(property)
 
 
-def monitors_from_properties(properties: list[ANY_PROP], lang: str = 'py') -> list[str]:
+def monitors_from_properties(
+    properties: list[ANY_PROP],
+    lang: str = 'py',
+    optimization: int = 0,
+) -> list[str]:
     """
     Produces a list of monitor code snippets,
     given a list of HPL properties.
     """
     parser = property_parser()
-    r = MonitorGenerator(lang=lang)
+    r = MonitorGenerator(lang=lang, optimization=optimization)
     outputs = []
     for property in properties:
         if not isinstance(property, HplProperty):
@@ -131,13 +191,34 @@ def monitors_from_properties(properties: list[ANY_PROP], lang: str = 'py') -> li
     return outputs
 
 
-def lib_from_properties(properties: list[ANY_PROP], lang: str = 'py') -> str:
+def lib_from_properties(
+    properties: list[ANY_PROP],
+    lang: str = 'py',
+    live_server: bool = True,
+    share_classes: bool = False,
+    key_field: str | None = None,
+    evict_after: float | None = DEFAULT_EVICT_AFTER,
+    vectorized: bool = False,
+    instrument: bool = False,
+    metrics: bool = False,
+    optimization: int = 0,
+) -> str:
     """
     Produces a self-contained library of monitors,
     given a list of HPL properties.
     """
     parser = property_parser()
-    r = MonitorGenerator(lang=lang)
+    r = MonitorGenerator(
+        lang=lang,
+        live_server=live_server,
+        share_classes=share_classes,
+        key_field=key_field,
+        evict_after=evict_after,
+        vectorized=vectorized,
+        instrument=instrument,
+        metrics=metrics,
+        optimization=optimization,
+    )
     properties = [
         parser.parse(property)
         if not isinstance(property, HplProperty)
@@ -147,6 +228,78 @@ def lib_from_properties(properties: list[ANY_PROP], lang: str = 'py') -> str:
     return r.monitor_library(properties)
 
 
+def package_from_files(
+    paths: list[ANY_PATH],
+    live_server: bool = True,
+    share_classes: bool = False,
+    key_field: str | None = None,
+    evict_after: float | None = DEFAULT_EVICT_AFTER,
+    vectorized: bool = False,
+    instrument: bool = False,
+    metrics: bool = False,
+    optimization: int = 0,
+) -> dict[str, str]:
+    """
+    Produces the modules of a Python package of monitors, by file name,
+    given a list of paths to HPL files with specifications.
+    """
+    parser = specification_parser()
+    r = MonitorGenerator(
+        lang='py',
+        live_server=live_server,
+        share_classes=share_classes,
+        key_field=key_field,
+        evict_after=evict_after,
+        vectorized=vectorized,
+        instrument=instrument,
+        metrics=metrics,
+        optimization=optimization,
+    )
+    properties: list[HplProperty] = []
+    for input_path in paths:
+        path: Path = Path(input_path).resolve(strict=True)
+        text: str = path.read_text(encoding='utf-8').strip()
+        spec: HplSpecification = parser.parse(text)
+        properties.extend(spec.properties)
+    return r.monitor_package(properties)
+
+
+def package_from_properties(
+    properties: list[ANY_PROP],
+    live_server: bool = True,
+    share_classes: bool = False,
+    key_field: str | None = None,
+    evict_after: float | None = DEFAULT_EVICT_AFTER,
+    vectorized: bool = False,
+    instrument: bool = False,
+    metrics: bool = False,
+    optimization: int = 0,
+) -> dict[str, str]:
+    """
+    Produces the modules of a Python package of monitors, by file name,
+    given a list of HPL properties.
+    """
+    parser = property_parser()
+    r = MonitorGenerator(
+        lang='py',
+        live_server=live_server,
+        share_classes=share_classes,
+        key_field=key_field,
+        evict_after=evict_after,
+        vectorized=vectorized,
+        instrument=instrument,
+        metrics=metrics,
+        optimization=optimization,
+    )
+    properties = [
+        parser.parse(property)
+        if not isinstance(property, HplProperty)
+        else property
+        for property in properties
+    ]
+    return r.monitor_package(properties)
+
+
 @frozen
 class TemplateRenderer:
     jinja_env: Environment
@@ -186,6 +339,25 @@ class TemplateRenderer:
 class MonitorGenerator:
     renderer: TemplateRenderer = field(factory=TemplateRenderer.from_pkg_data)
     lang: str = 'py'
+    # whether libraries include the live monitoring server
+    live_server: bool = True
+    # whether libraries share classes among properties that differ only
+    # in literal values and topic names (py only)
+    share_classes: bool = False
+    # message field that splits each monitor into one instance per key (py only)
+    key_field: str | None = None
+    # time after which idle or decided keyed instances are dropped (None: never)
+    evict_after: float | None = DEFAULT_EVICT_AFTER
+    # whether keyed monitors sweep timers with NumPy (needs numpy at runtime)
+    vectorized: bool = False
+    # whether monitor classes expose the deadline of their timeouts
+    deadlines: bool = False
+    # whether monitors record call counts, timings and transitions (py only)
+    instrument: bool = False
+    # whether the live monitoring server exports Prometheus metrics (py only)
+    metrics: bool = False
+    # optimization level of the monitor state machines (0: none, up to 2)
+    optimization: int = 0
 
     def monitor_library(
         self,
@@ -195,32 +367,123 @@ class MonitorGenerator:
         template_file = f'{self.lang}/library.{self.lang}.jinja'
         return self.renderer.render_template(template_file, data)
 
+    def monitor_package(
+        self,
+        spec_or_properties: Iterable[HplProperty] | HplSpecification,
+    ) -> dict[str, str]:
+        # one module per monitor class, imported on demand by the manager
+        if self.lang != 'py':
+            raise ValueError(f'packages are not supported for language: {self.lang}')
+        data = self.data_for_monitor_library(spec_or_properties)
+        data['module_names'] = [f'monitor_{i}' for i in data['class_indices']]
+        modules = {
+            '__init__.py': self.renderer.render_template('py/package/init.py.jinja', data),
+            '_common.py': self.renderer.render_template('py/package/common.py.jinja', data),
+        }
+        if self.live_server:
+            modules['_live.py'] = self.renderer.render_template('py/package/live.py.jinja', data)
+        for i, code in enumerate(data['monitor_classes']):
+            modules[f'monitor_{i}.py'] = self.renderer.render_template(
+                'py/package/monitor.py.jinja',
+                {'monitor_class': code},
+            )
+        return modules
+
     def data_for_monitor_library(
         self,
         spec_or_properties: Iterable[HplProperty] | HplSpecification,
     ) -> dict[str, Any]:
         class_names = []
+        class_indices = []
+        instances = []
+        property_ids = []
+        monitor_topics = []
+        monitor_callbacks = []
         callbacks = {}
-        monitor_classes = []
+        monitor_classes: list[str] = []
         if isinstance(spec_or_properties, HplSpecification):
             spec_or_properties = spec_or_properties.properties
-        for p in spec_or_properties:
+        properties = list(spec_or_properties)
+        shared = self._shared_classes(properties)
+        groups: dict[Any, tuple[int, str]] = {}
+        for i, p in enumerate(properties):
             builder, template_file = self._template(p, True)
-            i = len(class_names)
             builder.class_name = f'Property{i}Monitor'
+            params = None
+            group = shared[i]
+            if group is None:
+                class_indices.append(len(monitor_classes))
+                monitor_classes.append(self._render_class(builder, template_file))
+            else:
+                key, params = group
+                if key not in groups:
+                    groups[key] = (len(monitor_classes), f'Shared{len(groups)}Monitor')
+                    monitor_classes.append(self._shared_class(properties[i], groups[key][1]))
+                k, builder.class_name = groups[key]
+                class_indices.append(k)
             class_names.append(builder.class_name)
+            instances.append((builder.class_name, builder, params))
+            pid = p.metadata.get('id')
+            property_ids.append(None if pid is None else str(pid))
+            monitor_topics.append(tuple(map(str, builder.on_msg)))
+            if params is None:
+                names = {topic: topic for topic in builder.on_msg}
+            else:
+                names = {topic: f'_t{params.topics.index(topic)}' for topic in builder.on_msg}
+            monitor_callbacks.append({
+                topic: 'on_msg_' + name.replace('/', '_') for topic, name in names.items()
+            })
             for name in builder.on_msg:
                 if name not in callbacks:
                     callbacks[name] = set()
                 callbacks[name].add(i)
-            data = {'state_machine': builder}
-            monitor_classes.append(self.renderer.render_template(template_file, data))
         return {
             'class_names': class_names,
+            'class_indices': class_indices,
+            'instances': instances,
+            'property_ids': property_ids,
+            'monitor_topics': monitor_topics,
+            'monitor_callbacks': monitor_callbacks,
             'monitor_classes': monitor_classes,
             'callbacks': callbacks,
+            'live_server': self.live_server,
+            'key_field': self.key_field,
+            'evict_after': self.evict_after if self.evict_after != float('inf') else None,
+            'vectorized': self.vectorized and self.key_field is not None,
+            'instrument': self.instrument,
+            'metrics': self.metrics and self.live_server,
         }
 
+    def _shared_classes(self, properties: list[HplProperty]) -> list[tuple[Any, Any] | None]:
+        # properties that render the same code, modulo literals and topics,
+        # share a single parameterized class; singletons keep their own
+        keys: list[tuple[Any, Any] | None] = [None] * len(properties)
+        if not self.share_classes or self.lang != 'py':
+            return keys
+        from hplrv.sharing import class_key, parameterize
+
+        groups: dict[Any, list[int]] = {}
+        for i, p in enumerate(properties):
+            param_property, params = parameterize(p)
+            builder, _template_file = self._template(param_property, False)
+            key = class_key(param_property, builder)
+            keys[i] = (key, params)
+            groups.setdefault(key, []).append(i)
+        for indices in groups.values():
+            if len(indices) == 1:
+                keys[indices[0]] = None
+        return keys
+
+    def _shared_class(self, hpl_property: HplProperty, class_name: str) -> str:
+        from hplrv.sharing import CLASS_PLACEHOLDER, bind_topics, parameterize
+
+        param_property, params = parameterize(hpl_property)
+        builder, template_file = self._template(param_property, False)
+        builder.class_name = CLASS_PLACEHOLDER
+        builder.parameterized = True
+        code = bind_topics(self._render_class(builder, template_file), len(params.topics))
+        return code.replace(CLASS_PLACEHOLDER, class_name)
+
     def monitor_class(
         self,
         hpl_property: HplProperty,
@@ -236,6 +499,15 @@ class MonitorGenerator:
         template_file = data['template_file']
         return self.renderer.render_template(template_file, data, encoding=encoding)
 
+    def _render_class(
+        self,
+        builder: Any,
+        template_file: str,
+        encoding: str | None = None,
+    ) -> str:
+        data = {'state_machine': builder}
+        return self.renderer.render_template(template_file, data, encoding=encoding)
+
     def data_for_monitor_class(
         self,
         hpl_property: HplProperty,
@@ -271,10 +543,18 @@ class MonitorGenerator:
             template_file = f'{self.lang}/prevention.{self.lang}.jinja'
         else:
             raise ValueError('unknown pattern: ' + str(hpl_property.pattern))
+        builder.keyed = self.key_field is not None
+        builder.has_deadline = self.deadlines or (builder.keyed and self.vectorized)
+        builder.instrumented = self.instrument
         if id_as_class:
             name = hpl_property.metadata.get('id', 'Property')
             name = ''.join(word.title() for word in name.split("_") if word)
             builder.class_name = name + 'Monitor'
+        if self.optimization > 0:
+            # the optimizer is loaded only when needed
+            from hplrv.ir import optimize
+
+            optimize(builder, self.optimization)
         return (builder, template_file)
 
 
@@ -294,16 +574,49 @@ def subprogram(
 def run(args: dict[str, Any], _settings: dict[str, Any]) -> int:
     parts: list[str] = []
     lang: str = args['lang']
+    options = {
+        'live_server': args['live_server'],
+        'share_classes': args['share_classes'],
+        'key_field': args['key_field'],
+        'evict_after': args['evict_after'],
+        'vectorized': args['vectorized'],
+        'instrument': args['instrument'],
+        'metrics': args['metrics'],
+        'optimization': args['optimization'],
+    }
+    if options['key_field'] and (lang != 'py' or args.get('just_classes')):
+        print(f'{PROG_GEN}: --key-field only supports py libraries')
+        return 1
+    if options['vectorized'] and not options['key_field']:
+        print(f'{PROG_GEN}: --vectorize requires --key-field')
+        return 1
+    if options['instrument'] and (lang != 'py' or args.get('just_classes') or options['key_field']):
+        print(f'{PROG_GEN}: --instrument only supports py libraries without --key-field')
+        return 1
+    with_library = lang == 'py' and not args.get('just_classes')
+    if options['metrics'] and not (with_library and options['live_server']):
+        print(f'{PROG_GEN}: --metrics only supports py libraries with a live server')
+        return 1
+    if args.get('package'):
+        return _write_package(args, options)
     if args.get('files'):
         if args.get('just_classes'):
-            parts.extend(monitors_from_files(args['args'], lang=lang))
+            parts.extend(monitors_from_files(
+                args['args'],
+                lang=lang,
+                optimization=options['optimization'],
+            ))
         else:
-            parts.append(lib_from_files(args['args'], lang=lang))
+            parts.append(lib_from_files(args['args'], lang=lang, **options))
     else:
         if args.get('just_classes'):
-            parts.extend(monitors_from_properties(args['args'], lang=lang))
+            parts.extend(monitors_from_properties(
+                args['args'],
+                lang=lang,
+                optimization=options['optimization'],
+            ))
         else:
-            parts.append(lib_from_properties(args['args'], lang=lang))
+            parts.append(lib_from_properties(args['args'], lang=lang, **options))
     output: str = '\n\n'.join(code for code in parts)
 
     input_path: str = args.get('output')
@@ -315,6 +628,21 @@ def run(args: dict[str, Any], _settings: dict[str, Any]) -> int:
     return 0
 
 
+def _write_package(args: dict[str, Any], options: dict[str, Any]) -> int:
+    if args['lang'] != 'py' or args.get('just_classes') or not args.get('output'):
+        print(f'{PROG_GEN}: --package requires --output, and only supports py libraries')
+        return 1
+    if args.get('files'):
+        modules = package_from_files(args['args'], **options)
+    else:
+        modules = package_from_properties(args['args'], **options)
+    path: Path = Path(args['output']).resolve(strict=False)
+    path.mkdir(parents=True, exist_ok=True)
+    for filename, code in modules.items():
+        (path / filename).write_text(code + '\n', encoding='utf-8')
+    return 0
+
+
 ###############################################################################
 # Argument Parsing
 ###############################################################################
@@ -349,6 +677,74 @@ def parse_arguments(argv: list[str] | None) -> dict[str, Any]:
         help='language of the generated code (default: py)',
     )
 
+    parser.add_argument(
+        '-p',
+        '--package',
+        action='store_true',
+        help='output a package directory, with one module per monitor (py only)',
+    )
+
+    parser.add_argument(
+        '--no-live-server',
+        dest='live_server',
+        action='store_false',
+        help='omit the live monitoring server from libraries (py only)',
+    )
+
+    parser.add_argument(
+        '--shared-classes',
+        dest='share_classes',
+        action='store_true',
+        help='share one class among properties that differ only in constants (py only)',
+    )
+
+    parser.add_argument(
+        '-k',
+        '--key-field',
+        metavar='FIELD',
+        help='run one monitor instance per value of this message field (py only)',
+    )
+
+    parser.add_argument(
+        '--evict-after',
+        metavar='SECONDS',
+        type=float,
+        default=DEFAULT_EVICT_AFTER,
+        help=f'drop keyed instances idle or decided for this long (default: {DEFAULT_EVICT_AFTER})',
+    )
+
+    parser.add_argument(
+        '--vectorize',
+        dest='vectorized',
+        action='store_true',
+        help='index the deadlines of keyed instances in a NumPy array for timer sweeps; '
+             'their states stay in the monitor objects (requires numpy)',
+    )
+
+    parser.add_argument(
+        '--instrument',
+        action='store_true',
+        help='record call counts, timings and state transitions, exposed via stats()',
+    )
+
+    parser.add_argument(
+        '--metrics',
+        action='store_true',
+        help='serve Prometheus metrics from the live monitoring server (py only)',
+    )
+
+    parser.add_argument(
+        '-O',
+        '--optimize',
+        dest='optimization',
+        type=int,
+        choices=(0, 1, 2),
+        default=0,
+        help='optimize the monitor state machines: 1 folds constant guards and drops'
+        ' dead transitions, 2 also orders guards by cost and drops unreachable'
+        ' states and timers (default: 0)',
+    )
+
     parser.add_argument('args', nargs='+', help='input properties')
 
     args = parser.parse_args(args=argv)
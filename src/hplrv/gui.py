@@ -12,44 +12,148 @@ dashboard server to manage runtime monitors.
 
 from typing import Any, Final
 
-from collections.abc import Callable
+from collections.abc import Callable, Iterator
 
 import argparse
+import gzip
+from hashlib import sha256
+from importlib.resources import files
 import json
-from pathlib import Path
-import pkg_resources
+import mimetypes
+from struct import Struct
+import sys
 
 from attrs import define, field, frozen
-from bottle import Bottle, request, response, run as serve_forever, static_file
+from bottle import Bottle, HTTPError, HTTPResponse, request, response, run as serve_forever
 from bottle.ext.websocket import GeventWebSocketServer, websocket  # type: ignore
 import gevent
-from gevent.queue import Queue
+from gevent.event import Event
 from gevent.socket import create_connection, socket
 
 # from hpl.ast import HplProperty, HplSpecification
 # from hpl.parser import property_parser, specification_parser
 
+from hplrv.cli import positive_float
+
 ###############################################################################
 # Constants
 ###############################################################################
 
 PROG_GUI: Final[str] = 'hpl-rv gui'
 
-CLIENT_ROOT: Final[str] = str(
-    Path(pkg_resources.resource_filename('hplrv', 'dashboard/index.html'))
-    .resolve(strict=True)
-    .parent
-)
+CLIENT_PACKAGE: Final[str] = 'hplrv'
+CLIENT_DIR: Final[str] = 'dashboard'
+
+# assets may change between versions; clients revalidate with the ETag
+ASSET_CACHE_CONTROL: Final[str] = 'no-cache'
 
 type WS_UPDATE_CB_TYPE = Callable[[dict[str, Any]], None]
 
 COMPACT: Final[tuple[str, str]] = (',', ':')
 
+DEFAULT_MAX_RATE: Final[float] = 10.0  # websocket frames per second, per client
+
+RECONNECT_ATTEMPTS: Final[int] = 5
+RECONNECT_DELAY: Final[float] = 1.0  # seconds, grows linearly with attempts
+
+WIRE_JSON: Final[str] = 'json'
+WIRE_BINARY: Final[str] = 'binary'
+
+# must match the binary frames of the generated `LiveMonitoringServer`
+FRAME_LENGTH: Final[Struct] = Struct('>I')
+FRAME_VERDICT: Final[int] = 1
+VERDICT_HEAD: Final[Struct] = Struct('>BQIBd')  # frame type, seq, monitor, value, timestamp
+TOPIC_DEF: Final[Struct] = Struct('>HH')  # topic id, length of the topic name
+RECORD_HEAD: Final[Struct] = Struct('>HdI')  # topic id, timestamp, length of the message
+ITEM_COUNT: Final[Struct] = Struct('>H')
+
 
 def noop(*args, **kwargs):
     pass
 
 
+def decode_verdict_frame(payload: bytes, topics: list[str]) -> dict[str, Any]:
+    """
+    Decodes the payload of a binary verdict frame into the same structure
+    that is sent in the JSON wire format.
+    New topic definitions found in the frame are added to `topics`.
+    """
+    frame_type, seq, monitor, value, timestamp = VERDICT_HEAD.unpack_from(payload)
+    if frame_type != FRAME_VERDICT:
+        raise ValueError(f'unknown frame type: {frame_type}')
+    offset = VERDICT_HEAD.size
+    (n,) = ITEM_COUNT.unpack_from(payload, offset)
+    offset += ITEM_COUNT.size
+    for _ in range(n):
+        i, length = TOPIC_DEF.unpack_from(payload, offset)
+        offset += TOPIC_DEF.size
+        if i >= len(topics):
+            topics.extend([''] * (i + 1 - len(topics)))
+        topics[i] = payload[offset : offset + length].decode('utf8')
+        offset += length
+    (n,) = ITEM_COUNT.unpack_from(payload, offset)
+    offset += ITEM_COUNT.size
+    witness = []
+    for _ in range(n):
+        i, stamp, length = RECORD_HEAD.unpack_from(payload, offset)
+        offset += RECORD_HEAD.size
+        message = payload[offset : offset + length].decode('utf8')
+        offset += length
+        witness.append({'topic': topics[i], 'timestamp': stamp, 'message': message})
+    return {
+        'seq': seq,
+        'value': bool(value),
+        'monitor': monitor,
+        'timestamp': timestamp,
+        'witness': witness,
+    }
+
+
+###############################################################################
+# Static Assets
+###############################################################################
+
+
+@frozen
+class StaticAsset:
+    """
+    A dashboard file held in memory, along with its gzip encoding
+    (if that is any smaller) and strong entity tags for each.
+    """
+
+    content: bytes
+    mimetype: str
+    etag: str
+    gzipped: bytes | None = None
+    gzip_etag: str = ''
+
+    @classmethod
+    def from_bytes(cls, filename: str, content: bytes) -> 'StaticAsset':
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        if mimetype.startswith('text/') or mimetype.endswith('javascript'):
+            mimetype += '; charset=UTF-8'
+        digest = sha256(content).hexdigest()
+        gzipped = gzip.compress(content, mtime=0)
+        if len(gzipped) >= len(content):
+            return cls(content, mimetype, f'"{digest}"')
+        return cls(content, mimetype, f'"{digest}"', gzipped=gzipped, gzip_etag=f'"{digest}-gzip"')
+
+
+def load_static_assets() -> dict[str, StaticAsset]:
+    assets = {}
+    root = files(CLIENT_PACKAGE) / CLIENT_DIR
+    for entry in root.iterdir():
+        if entry.is_file():
+            assets[entry.name] = StaticAsset.from_bytes(entry.name, entry.read_bytes())
+    return assets
+
+
+def _etag_matches(etag: str, header: str) -> bool:
+    if header.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in header.split(','))
+
+
 ###############################################################################
 # Live Monitoring Client/Server
 ###############################################################################
@@ -57,49 +161,93 @@ def noop(*args, **kwargs):
 
 @define
 class SocketStreamReader:
-    # taken from
-    # https://stackoverflow.com/a/65637828
+    """
+    Buffered reader for stream sockets.
+    Received bytes are appended to a single buffer that is consumed from
+    a read offset, and compacted once most of it has been consumed.
+    Separator searches resume where the previous search stopped, so each
+    received byte is scanned once, and each line is copied once.
+    """
 
     _sock: socket
-    _recv_buffer: bytearray = field(factory=bytearray, init=False, eq=False)
+    chunk_size: int = 65536
+    _buffer: bytearray = field(factory=bytearray, init=False, eq=False)
+    _chunk: bytearray = field(default=None, init=False, eq=False)
+    _start: int = field(default=0, init=False, eq=False)
+    _scanned: int = field(default=0, init=False, eq=False)
+    _eof: bool = field(default=False, init=False, eq=False)
+
+    def __attrs_post_init__(self):
+        self._chunk = bytearray(self.chunk_size)
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buffer) - self._start
 
     def read(self, num_bytes: int = -1) -> bytes:
-        raise NotImplementedError
+        # reads exactly `num_bytes` (or until EOF, if negative),
+        # unless the connection is closed before that
+        while num_bytes < 0 or self.buffered < num_bytes:
+            if not self._fill():
+                break
+        if num_bytes < 0:
+            num_bytes = self.buffered
+        return self._take(self._start + min(num_bytes, self.buffered))
 
     def readline(self) -> str:
         return self.readuntil(b'\n').decode('utf8')
 
     def readuntil(self, separator: bytes = b'\n') -> bytes:
+        # returns an incomplete line (or b'') if the connection is closed
         if len(separator) != 1:
             raise ValueError('Only separators of length 1 are supported.')
-
-        chunk = bytearray(4096)
-        start = 0
-        buf = bytearray(len(self._recv_buffer))
-        bytes_read = self._recv_into(memoryview(buf))
-        assert bytes_read == len(buf)
-
         while True:
-            idx = buf.find(separator, start)
-            if idx != -1:
-                break
-
-            start = len(self._recv_buffer)
-            bytes_read = self._recv_into(memoryview(chunk))
-            buf += memoryview(chunk)[:bytes_read]
-
-        result = bytes(buf[: idx + 1])
-        self._recv_buffer = b''.join((memoryview(buf)[idx + 1 :], self._recv_buffer))
-        return result
-
-    def _recv_into(self, view: memoryview) -> int:
-        bytes_read = min(len(view), len(self._recv_buffer))
-        view[:bytes_read] = self._recv_buffer[:bytes_read]
-        self._recv_buffer = self._recv_buffer[bytes_read:]
-        if bytes_read == len(view):
-            return bytes_read
-        bytes_read += self._sock.recv_into(view[bytes_read:])
-        return bytes_read
+            idx = self._buffer.find(separator, max(self._start, self._scanned))
+            if idx >= 0:
+                return self._take(idx + 1)
+            self._scanned = len(self._buffer)
+            if not self._fill():
+                return self._take(len(self._buffer))
+
+    def readlines(self, separator: bytes = b'\n') -> list[bytes]:
+        # returns all complete lines that can be read with (at most) the
+        # same number of `recv` calls needed for the first one;
+        # returns an empty list once the connection is closed
+        line = self.readuntil(separator)
+        if not line:
+            return []
+        lines = [line]
+        idx = self._buffer.find(separator, self._start)
+        while idx >= 0:
+            lines.append(self._take(idx + 1))
+            idx = self._buffer.find(separator, self._start)
+        self._scanned = len(self._buffer)
+        return lines
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        bytes_read = self._sock.recv_into(self._chunk)
+        if bytes_read == 0:
+            self._eof = True
+            return False
+        with memoryview(self._chunk) as view:
+            self._buffer += view[:bytes_read]
+        return True
+
+    def _take(self, end: int) -> bytes:
+        with memoryview(self._buffer) as view:
+            data = view[self._start : end].tobytes()
+        self._start = end
+        if self._start >= len(self._buffer):
+            self._buffer.clear()
+            self._start = self._scanned = 0
+        elif self._start > (len(self._buffer) >> 1):
+            # amortized: only move bytes once they are the minority
+            del self._buffer[: self._start]
+            self._scanned = max(0, self._scanned - self._start)
+            self._start = 0
+        return data
 
 
 @frozen
@@ -108,12 +256,18 @@ class LiveMonitoringServer:
     A gevent greenlet to handle live monitoring status updates.
     If handling multiple multiple live monitoring sources, it is
     preferred to use a shared `updates` queue to make waiting easier.
+    The `session` and `last_seq` of the last received verdict are kept
+    across connections, so that reconnecting only fetches missed verdicts.
     """
 
     host: str
     port: int
     on_update: WS_UPDATE_CB_TYPE = field(default=noop, eq=False, order=False)
+    wire_format: str = field(default=WIRE_BINARY, eq=False, order=False)
     monitors: list[dict[str, Any]] = field(factory=list, init=False, eq=False, order=False)
+    topics: list[str] = field(factory=list, init=False, eq=False, order=False)
+    session: str | None = field(default=None, init=False, eq=False, order=False)
+    last_seq: int | None = field(default=None, init=False, eq=False, order=False)
     _socket: socket | None = field(default=None, init=False, eq=False, order=False)
 
     @property
@@ -123,29 +277,69 @@ class LiveMonitoringServer:
     def connect(self):
         if self._socket is None:
             s = create_connection((self.host, self.port))
-            object.__setattr__(self, "_socket", s)
+            request: dict[str, Any] = {'format': self.wire_format}
+            if self.session is not None:
+                request['session'] = self.session
+                request['seq'] = self.last_seq
+            s.sendall(json.dumps(request, separators=COMPACT).encode('utf8') + b'\n')
+            object.__setattr__(self, '_socket', s)
 
     def run(self):
         try:
             with self._socket:
                 reader = SocketStreamReader(self._socket)
 
-                # read initial monitor report
+                # read initial monitor report, or resume from the last one
                 data = reader.readline()
                 if not data:
                     return
-                self.monitors.clear()
-                self.monitors.extend(json.loads(data))
-                self.push_status()
-
-                # read status updates
-                data = reader.readline()
-                while data:
-                    verdict = json.loads(data)
-                    self.push_verdict(verdict)
-                    data = reader.readline()
+                header = json.loads(data)
+                if isinstance(header, list):
+                    # older servers send a bare report and unnumbered verdicts
+                    self.monitors.clear()
+                    self.monitors.extend(header)
+                    self.push_status()
+                    for verdict in self._read_lines(reader):
+                        self.push_verdict(verdict)
+                    return
+                object.__setattr__(self, 'session', header['session'])
+                object.__setattr__(self, 'last_seq', header['seq'])
+                if header['report'] is not None:
+                    self.monitors.clear()
+                    self.monitors.extend(header['report'])
+                    self.push_status()
+
+                # read status updates; older servers only speak JSON
+                if header.get('format') == WIRE_BINARY:
+                    self.topics.clear()
+                    self.topics.extend(header['topics'])
+                    verdicts = self._read_frames(reader)
+                else:
+                    verdicts = self._read_lines(reader)
+                for verdict in verdicts:
+                    if verdict['seq'] > self.last_seq:
+                        object.__setattr__(self, 'last_seq', verdict['seq'])
+                        self.push_verdict(verdict)
         finally:
-            object.__setattr__(self, "_socket", None)
+            object.__setattr__(self, '_socket', None)
+
+    def _read_lines(self, reader: SocketStreamReader) -> Iterator[dict[str, Any]]:
+        lines = reader.readlines()
+        while lines:
+            for data in lines:
+                if data.endswith(b'\n'):  # else, truncated by EOF
+                    yield json.loads(data)
+            lines = reader.readlines()
+
+    def _read_frames(self, reader: SocketStreamReader) -> Iterator[dict[str, Any]]:
+        data = reader.read(FRAME_LENGTH.size)
+        while len(data) == FRAME_LENGTH.size:
+            (length,) = FRAME_LENGTH.unpack(data)
+            payload = reader.read(length)
+            if len(payload) < length:
+                return
+            yield decode_verdict_frame(payload, self.topics)
+            data = reader.read(FRAME_LENGTH.size)
 
     def push_status(self):
         for i in range(len(self.monitors)):
@@ -178,28 +372,163 @@ class LiveMonitoringServer:
         }
 
 
+###############################################################################
+# Aggregated State
+###############################################################################
+
+
 @frozen
+class Subscription:
+    """
+    What a dashboard client wants to receive.
+    `None` means no filtering; otherwise, only the given server addresses
+    (`host:port`) and verdicts (`True`, `False` or `None`) are sent.
+    """
+
+    servers: frozenset[str] | None = None
+    verdicts: frozenset[bool | None] | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'Subscription':
+        servers = data.get('servers')
+        verdicts = data.get('verdicts')
+        return cls(
+            servers=None if servers is None else frozenset(map(str, servers)),
+            verdicts=None if verdicts is None else frozenset(verdicts),
+        )
+
+    def accepts_server(self, server: str) -> bool:
+        return self.servers is None or server in self.servers
+
+    def accepts_verdict(self, verdict: bool | None) -> bool:
+        return self.verdicts is None or verdict in self.verdicts
+
+
+@define
+class MonitorStateStore:
+    """
+    Latest known state of every monitor, keyed by (server, monitor index).
+    Each effective change bumps `version`, so that clients can ask for
+    whatever changed since the last version they have seen.
+    Witnesses are kept apart, and only sent upon request.
+    """
+
+    version: int = field(default=0, init=False)
+    listeners: set[Event] = field(factory=set, init=False, eq=False)
+    _monitors: dict[str, dict[int, dict[str, Any]]] = field(factory=dict, init=False, eq=False)
+    _witnesses: dict[tuple[str, int], Any] = field(factory=dict, init=False, eq=False)
+    # key -> version of its last change; insertion order is version order
+    _changes: dict[tuple[str, int], int] = field(factory=dict, init=False, eq=False)
+    _summary: dict[str, dict[str, int]] = field(factory=dict, init=False, eq=False)
+
+    def update(self, server: str, i: int, monitor: dict[str, Any]) -> None:
+        key = (server, i)
+        witness = monitor.get('witness')
+        data = {k: v for k, v in monitor.items() if k != 'witness'}
+        monitors = self._monitors.setdefault(server, {})
+        previous = monitors.get(i)
+        if previous == data and self._witnesses.get(key) == witness:
+            return  # e.g., a snapshot after reconnecting
+        self.version += 1
+        monitors[i] = data
+        self._witnesses[key] = witness
+        self._changes.pop(key, None)
+        self._changes[key] = self.version
+        summary = self._summary.setdefault(server, {'monitors': 0, 'success': 0, 'failure': 0})
+        if previous is None:
+            summary['monitors'] += 1
+        else:
+            self._count_verdict(summary, previous.get('verdict'), -1)
+        self._count_verdict(summary, data.get('verdict'), 1)
+        for listener in self.listeners:
+            listener.set()
+
+    def witness(self, server: str, i: int) -> Any:
+        return self._witnesses.get((server, i))
+
+    def snapshot(self, subscription: Subscription) -> dict[str, Any]:
+        servers: dict[str, list[list[Any]]] = {}
+        for server, monitors in self._monitors.items():
+            if not subscription.accepts_server(server):
+                continue
+            servers[server] = [
+                [i, monitor]
+                for i, monitor in monitors.items()
+                if subscription.accepts_verdict(monitor.get('verdict'))
+            ]
+        return {
+            'type': 'snapshot',
+            'version': self.version,
+            'servers': servers,
+            'summary': self._summary,
+        }
+
+    def delta(self, since: int, subscription: Subscription) -> dict[str, Any] | None:
+        servers: dict[str, list[list[Any]]] = {}
+        summary: dict[str, dict[str, int]] = {}
+        # most recent first, until reaching what the client already has
+        for key in reversed(self._changes):
+            if self._changes[key] <= since:
+                break
+            server, i = key
+            summary[server] = self._summary[server]
+            if not subscription.accepts_server(server):
+                continue
+            monitor = self._monitors[server][i]
+            # the client should drop the monitor, if displayed
+            visible = subscription.accepts_verdict(monitor.get('verdict'))
+            servers.setdefault(server, []).append([i, monitor if visible else None])
+        if not summary:
+            return None
+        return {
+            'type': 'delta',
+            'version': self.version,
+            'servers': servers,
+            'summary': summary,
+        }
+
+    def _count_verdict(self, summary: dict[str, int], verdict: bool | None, n: int) -> None:
+        if verdict is True:
+            summary['success'] += n
+        elif verdict is False:
+            summary['failure'] += n
+
+
+@define(eq=False)
 class LiveMonitoringClient:
     websocket: Any
-    updates: Queue = field(factory=Queue, init=False, eq=False, order=False)
-
-    def send_initial_server_status(self, host: str, port: int, monitors: list[dict[str, Any]]):
-        server: str = f'{host}:{port}'
-        for i in range(len(monitors)):
-            monitor = monitors[i]
-            data = {
-                'server': server,
-                'id': i,
-                'monitor': monitor,
-            }
-            self.send_monitor_status(data)
+    subscription: Subscription = field(factory=Subscription)
+    # set whenever there is something to send
+    pending: Event = field(factory=Event, init=False)
+    # last version sent; negative when a new snapshot is due
+    version: int = field(default=-1, init=False)
 
-    def get_and_send_update(self):
-        status = self.updates.get()
-        self.send_monitor_status(status)
+    def receive_subscriptions(self):
+        try:
+            while True:
+                message = self.websocket.receive()
+                if message is None:
+                    break
+                try:
+                    data = json.loads(message)
+                    subscription = Subscription.from_dict(data['subscribe'])
+                except (ValueError, TypeError, KeyError):
+                    continue
+                self.subscription = subscription
+                self.version = -1
+                self.pending.set()
+        finally:
+            self.pending.set()  # wake up the sender so that it notices
 
-    def send_monitor_status(self, status: dict[str, Any]):
-        self.websocket.send(json.dumps(status, separators=COMPACT))
+    def send_updates(self, store: MonitorStateStore) -> None:
+        frame: dict[str, Any] | None
+        if self.version < 0:
+            frame = store.snapshot(self.subscription)
+        else:
+            frame = store.delta(self.version, self.subscription)
+        self.version = store.version
+        if frame is not None:
+            self.websocket.send(json.dumps(frame, separators=COMPACT))
 
 
 ###############################################################################
@@ -226,37 +555,76 @@ class MonitorServer:
     app: Bottle
     servers: set[LiveMonitoringServer] = field(factory=set, init=False, eq=False, order=False)
     clients: set[LiveMonitoringClient] = field(factory=set, init=False, eq=False, order=False)
+    store: MonitorStateStore = field(factory=MonitorStateStore, init=False, eq=False, order=False)
+    assets: dict[str, StaticAsset] = field(
+        factory=load_static_assets, init=False, eq=False, order=False
+    )
+    wire_format: str = WIRE_BINARY
+    max_rate: float = DEFAULT_MAX_RATE
 
     def __attrs_post_init__(self):
         self.app.get('/')(self.index)
+        self.app.get('/witness/<server>/<i:int>')(self.send_witness)
         self.app.get('/<filename:path>')(self.send_static_file)
         self.app.post('/live')(self.connect_to_live_server)
         self.app.get('/ws', apply=[websocket])(self.live_updates)
 
     def index(self):
-        return static_file('index.html', root=CLIENT_ROOT, mimetype='text/html')
+        return self.send_static_file('index.html')
 
     def send_static_file(self, filename):
-        return static_file(filename, root=CLIENT_ROOT)
+        asset = self.assets.get(filename)
+        if asset is None:
+            return HTTPError(404, 'File does not exist.')
+        use_gzip = asset.gzipped is not None and 'gzip' in request.get_header(
+            'Accept-Encoding', ''
+        )
+        etag = asset.gzip_etag if use_gzip else asset.etag
+        headers = {
+            'ETag': etag,
+            'Cache-Control': ASSET_CACHE_CONTROL,
+            'Vary': 'Accept-Encoding',
+        }
+        if _etag_matches(etag, request.get_header('If-None-Match', '')):
+            return HTTPResponse(status=304, **headers)
+        headers['Content-Type'] = asset.mimetype
+        if use_gzip:
+            headers['Content-Encoding'] = 'gzip'
+            return HTTPResponse(asset.gzipped, **headers)
+        return HTTPResponse(asset.content, **headers)
+
+    def send_witness(self, server: str, i: int) -> dict[str, Any]:
+        return {'witness': self.store.witness(server, i)}
 
     def live_updates(self, ws):
+        # one snapshot, then batched deltas, at most `max_rate` frames per second
         client = LiveMonitoringClient(ws)
+        receiver = gevent.spawn(client.receive_subscriptions)
         self.clients.add(client)
+        self.store.listeners.add(client.pending)
+        client.pending.set()
         try:
-            # send initial status reports
-            for server in self.servers:
-                client.send_initial_server_status(server.host, server.port, server.monitors)
-            while True:
-                client.get_and_send_update()
+            while not receiver.dead:
+                client.pending.wait()
+                client.pending.clear()
+                client.send_updates(self.store)
+                gevent.sleep(1.0 / self.max_rate)
         finally:
+            self.store.listeners.discard(client.pending)
             self.clients.remove(client)
+            receiver.kill()
 
     def connect_to_live_server(self):
         # host: str = request.forms.get('host')
         # port: int = int(request.forms.get('port'))
         host: str = request.json.get('host')
         port: int = request.json.get('port')
-        server = LiveMonitoringServer(host, port, on_update=self._on_live_server_update)
+        server = LiveMonitoringServer(
+            host,
+            port,
+            on_update=self._on_live_server_update,
+            wire_format=self.wire_format,
+        )
         if server in self.servers:
             return {'servers': [s.asdict() for s in self.servers]}
         try:
@@ -272,14 +640,37 @@ class MonitorServer:
 
     def _handle_live_server(self, server: LiveMonitoringServer):
         try:
-            server.run()
+            while True:
+                try:
+                    server.run()
+                except OSError:
+                    pass
+                except (TypeError, KeyError, ValueError) as e:
+                    # reconnecting would only fail the same way
+                    print(
+                        f'incompatible live server {server.host}:{server.port}: {e!r}',
+                        file=sys.stderr,
+                    )
+                    break
+                if not self._reconnect(server):
+                    break
         finally:
             self.servers.remove(server)
 
+    def _reconnect(self, server: LiveMonitoringServer) -> bool:
+        # the server remembers its last verdict, so this only fetches deltas
+        for attempt in range(1, RECONNECT_ATTEMPTS + 1):
+            gevent.sleep(RECONNECT_DELAY * attempt)
+            try:
+                server.connect()
+                return True
+            except OSError:
+                pass
+        return False
+
     def _on_live_server_update(self, update):
-        # broadcast to all clients
-        for client in self.clients:
-            client.updates.put(update)
+        # clients are woken up by the store
+        self.store.update(update['server'], update['id'], update['monitor'])
 
 
 ###############################################################################
@@ -298,7 +689,11 @@ def subprogram(
 def run(args: dict[str, Any], _settings: dict[str, Any]) -> int:
     # TODO use gevent.kill(greenlet) or gevent.killall(greenlets, block=True, timeout=None)
     # with KeyboardInterrupt to kill all ongoing greenlets.
-    server = MonitorServer(Bottle())
+    server = MonitorServer(
+        Bottle(),
+        wire_format=args['wire_format'],
+        max_rate=args['max_rate'],
+    )
     serve_forever(
         app=server.app, host=args['host'], port=args['port'], server=GeventWebSocketServer
     )
@@ -326,5 +721,19 @@ def parse_arguments(argv: list[str] | None) -> dict[str, Any]:
         help=f'port of the HTTP server (default: 8080)',
     )
 
+    parser.add_argument(
+        '--wire-format',
+        choices=(WIRE_BINARY, WIRE_JSON),
+        default=WIRE_BINARY,
+        help=f'preferred format of live monitoring streams (default: {WIRE_BINARY})',
+    )
+
+    parser.add_argument(
+        '--max-rate',
+        type=positive_float,
+        default=DEFAULT_MAX_RATE,
+        help=f'max. updates per second sent to each dashboard (default: {DEFAULT_MAX_RATE})',
+    )
+
     args = parser.parse_args(args=argv)
     return vars(args)
@@ -0,0 +1,389 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André Santos
+
+"""
+Module that contains an intermediate representation of monitor state
+machines, as lists of guarded transitions, and the optimization passes
+that rewrite it before the templates render the code.
+"""
+
+###############################################################################
+# Imports
+###############################################################################
+
+from typing import Final, cast
+
+from collections import defaultdict
+from collections.abc import Callable
+
+from attrs import define, evolve, frozen
+from hpl.ast import (
+    HplArrayAccess,
+    HplBinaryOperator,
+    HplContradiction,
+    HplExpression,
+    HplFunctionCall,
+    HplPredicateExpression,
+    HplQuantifier,
+    HplVacuousTruth,
+)
+from hpl.rewrite import simplify
+
+from hplrv.monitors import (
+    AbsenceBuilder,
+    BehaviourEvent,
+    EventType,
+    ExistenceBuilder,
+    MonitoringEvent,
+    MonitorState,
+    PatternBasedBuilder,
+    PreventionBuilder,
+    RequirementBuilder,
+    ResponseBuilder,
+    TerminatorEvent,
+    _default_dict_of_lists,
+)
+
+###############################################################################
+# Constants
+###############################################################################
+
+# relative cost of evaluating guard nodes, other nodes cost 1
+QUANTIFIER_COST: Final[int] = 10
+FUNCTION_CALL_COST: Final[int] = 3
+
+VERDICT_STATES: Final[dict[bool | None, MonitorState]] = {
+    True: MonitorState.TRUE,
+    False: MonitorState.FALSE,
+    None: MonitorState.INACTIVE,
+}
+
+###############################################################################
+# Data Structures
+###############################################################################
+
+
+@frozen
+class Transition:
+    topic: str
+    source: MonitorState
+    event: MonitoringEvent
+    # states the monitor may be in after the event (including the source)
+    targets: tuple[MonitorState, ...]
+
+    @property
+    def always_returns(self) -> bool:
+        # a satisfied guard returns, unless a behaviour checks a pool of triggers
+        if isinstance(self.event, BehaviourEvent) and self.event.trigger:
+            return False
+        phi = self.event.predicate
+        return bool(phi.is_vacuous and phi.is_true)
+
+    @property
+    def never_fires(self) -> bool:
+        phi = self.event.predicate
+        return phi.is_vacuous and not phi.is_true
+
+
+@frozen
+class TimerTransition:
+    source: MonitorState
+    targets: tuple[MonitorState, ...]
+
+
+@define
+class MonitorIR:
+    initial_state: MonitorState
+    entry_state: MonitorState
+    # in the order of the builder's `on_msg` (topic, then source state)
+    transitions: list[Transition]
+    timers: list[TimerTransition]
+    topics: list[str]
+    has_timer: bool
+
+    @classmethod
+    def from_builder(cls, builder: PatternBasedBuilder) -> 'MonitorIR':
+        transitions = []
+        for topic, states in builder.on_msg.items():
+            for state, events in states.items():
+                for event in events:
+                    targets = _event_targets(builder, state, event)
+                    transitions.append(Transition(topic, state, event, targets))
+        timers = []
+        if builder.has_timer:
+            source, target = _timer_transition(builder)
+            timers.append(TimerTransition(source, (source, target)))
+        return cls(
+            builder.initial_state,
+            builder.entry_state,
+            transitions,
+            timers,
+            list(builder.on_msg),
+            builder.has_timer,
+        )
+
+    def reachable_states(self) -> set[MonitorState]:
+        edges: defaultdict[MonitorState, set[MonitorState]] = defaultdict(set)
+        for t in self.transitions:
+            edges[t.source].update(t.targets)
+        if self.has_timer:
+            for timer in self.timers:
+                edges[timer.source].update(timer.targets)
+        visited = {self.initial_state}
+        stack = [self.initial_state]
+        while stack:
+            for state in edges[stack.pop()]:
+                if state not in visited:
+                    visited.add(state)
+                    stack.append(state)
+        return visited
+
+    def lower(self, builder: PatternBasedBuilder) -> None:
+        # writes the state machine back in the shape the templates expect
+        on_msg: defaultdict[str, defaultdict[MonitorState, list[MonitoringEvent]]]
+        on_msg = defaultdict(_default_dict_of_lists)
+        for topic in self.topics:
+            transitions = [t for t in self.transitions if t.topic == topic]
+            # with timers, every message still checks for timeouts
+            if not transitions and not self.has_timer:
+                continue
+            states = on_msg[topic]
+            for t in transitions:
+                states[t.source].append(t.event)
+        builder.on_msg = on_msg
+        builder.has_timer = self.has_timer
+
+
+###############################################################################
+# Optimization Passes
+###############################################################################
+
+
+def fold_guards(ir: MonitorIR) -> None:
+    # only constant operands are folded, other operands are kept as written
+    for i, t in enumerate(ir.transitions):
+        phi = t.event.predicate
+        if phi.is_vacuous:
+            continue
+        expr = _fold_operands(phi.condition)
+        if expr is True:
+            phi = HplVacuousTruth()
+        elif expr is False:
+            phi = HplContradiction()
+        elif expr is not phi.condition:
+            phi = evolve(phi, expression=expr)
+        else:
+            continue
+        ir.transitions[i] = evolve(t, event=evolve(t.event, predicate=phi))
+
+
+def remove_dead_transitions(ir: MonitorIR) -> None:
+    transitions = []
+    shadowed = set()
+    for t in ir.transitions:
+        key = (t.topic, t.source)
+        if t.never_fires or key in shadowed:
+            continue
+        transitions.append(t)
+        if t.always_returns:
+            shadowed.add(key)
+    ir.transitions = transitions
+
+
+def order_guards(ir: MonitorIR) -> None:
+    # the operands of conjunctions and disjunctions are checked cheapest first,
+    # without moving any operand across one that may raise an exception
+    for i, t in enumerate(ir.transitions):
+        phi = t.event.predicate
+        if phi.is_vacuous:
+            continue
+        expr = _order_operands(phi.condition)
+        if expr is not phi.condition:
+            phi = evolve(phi, expression=expr)
+            ir.transitions[i] = evolve(t, event=evolve(t.event, predicate=phi))
+
+
+def remove_dead_states(ir: MonitorIR) -> None:
+    reachable = ir.reachable_states()
+    ir.transitions = [t for t in ir.transitions if t.source in reachable]
+    ir.timers = [t for t in ir.timers if t.source in reachable]
+
+
+def remove_redundant_timers(ir: MonitorIR) -> None:
+    reachable = ir.reachable_states()
+    if not any(t.source in reachable for t in ir.timers):
+        ir.has_timer = False
+
+
+OPTIMIZATION_LEVELS: Final[tuple[tuple[Callable[[MonitorIR], None], ...], ...]] = (
+    (),
+    (fold_guards, remove_dead_transitions),
+    (
+        fold_guards,
+        order_guards,
+        remove_dead_transitions,
+        remove_dead_states,
+        remove_redundant_timers,
+    ),
+)
+
+
+def optimize(builder: PatternBasedBuilder, level: int) -> PatternBasedBuilder:
+    """
+    Rewrites the state machine of a builder with the passes of
+    the given optimization level (0: none).
+    """
+    if level <= 0:
+        return builder
+    passes = OPTIMIZATION_LEVELS[min(level, len(OPTIMIZATION_LEVELS) - 1)]
+    ir = MonitorIR.from_builder(builder)
+    for optimization_pass in passes:
+        optimization_pass(ir)
+    ir.lower(builder)
+    return builder
+
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+
+def _event_targets(
+    builder: PatternBasedBuilder,
+    source: MonitorState,
+    event: MonitoringEvent,
+) -> tuple[MonitorState, ...]:
+    event_type = event.event_type
+    if event_type == EventType.ACTIVATOR:
+        target = builder.entry_state
+    elif event_type == EventType.TERMINATOR:
+        target = VERDICT_STATES[cast(TerminatorEvent, event).verdict]
+    elif event_type == EventType.BEHAVIOUR:
+        target = _behaviour_target(builder)
+    elif event_type == EventType.TRIGGER:
+        target = _trigger_target(builder, source)
+    else:
+        raise ValueError(f'unexpected event type: {event_type}')
+    return (source, target)
+
+
+def _behaviour_target(builder: PatternBasedBuilder) -> MonitorState:
+    if isinstance(builder, ExistenceBuilder):
+        return MonitorState.SAFE if builder.reentrant_scope else MonitorState.TRUE
+    if isinstance(builder, ResponseBuilder):
+        return MonitorState.SAFE
+    # absence, requirement and prevention
+    return MonitorState.FALSE
+
+
+def _trigger_target(builder: PatternBasedBuilder, source: MonitorState) -> MonitorState:
+    if isinstance(builder, RequirementBuilder):
+        if builder.has_trigger_refs or source != MonitorState.ACTIVE:
+            return source
+        if builder.timeout > 0.0 or builder.reentrant_scope:
+            return MonitorState.SAFE
+        return MonitorState.TRUE
+    # response and prevention
+    return MonitorState.ACTIVE
+
+
+def _timer_transition(builder: PatternBasedBuilder) -> tuple[MonitorState, MonitorState]:
+    if isinstance(builder, AbsenceBuilder):
+        if builder.reentrant_scope:
+            return (MonitorState.ACTIVE, MonitorState.SAFE)
+        return (MonitorState.ACTIVE, MonitorState.TRUE)
+    if isinstance(builder, RequirementBuilder):
+        if builder.has_trigger_refs:
+            return (MonitorState.ACTIVE, MonitorState.ACTIVE)
+        return (MonitorState.SAFE, MonitorState.ACTIVE)
+    if isinstance(builder, PreventionBuilder):
+        return (MonitorState.ACTIVE, MonitorState.SAFE)
+    # existence and response
+    return (MonitorState.ACTIVE, MonitorState.FALSE)
+
+
+def _fold_operands(expr: HplExpression) -> HplExpression | bool:
+    # returns a bool for constant expressions, or the same object if nothing changes
+    if not _is_junction(expr):
+        phi = simplify(HplPredicateExpression(expr))
+        return phi.is_true if phi.is_vacuous else expr
+    absorbing = expr.operator.is_or
+    original = _flatten(expr, expr.operator.token)
+    operands = []
+    for e in original:
+        e = _fold_operands(e)
+        if e is absorbing:
+            return absorbing
+        if e is not (not absorbing):
+            operands.append(e)
+    if not operands:
+        return not absorbing
+    if len(operands) == len(original) and all(a is b for a, b in zip(operands, original)):
+        return expr
+    return _join(expr, operands)
+
+
+def _order_operands(expr: HplExpression) -> HplExpression:
+    # returns the same object if nothing changes
+    if not _is_junction(expr):
+        return expr
+    original = _flatten(expr, expr.operator.token)
+    operands = [_order_operands(e) for e in original]
+    # operands that may raise stay in place, and nothing crosses them,
+    # so that short-circuiting never hides (or causes) an exception
+    order = []
+    segment = []
+    for i, e in enumerate(operands):
+        if _cannot_raise(e):
+            segment.append(i)
+        else:
+            order.extend(sorted(segment, key=lambda j: _cost(operands[j])))
+            order.append(i)
+            segment = []
+    order.extend(sorted(segment, key=lambda j: _cost(operands[j])))
+    if order == sorted(order) and all(a is b for a, b in zip(operands, original)):
+        return expr
+    return _join(expr, [operands[i] for i in order])
+
+
+def _is_junction(expr: HplExpression) -> bool:
+    if not isinstance(expr, HplBinaryOperator):
+        return False
+    return bool(expr.operator.is_and or expr.operator.is_or)
+
+
+def _join(expr: HplBinaryOperator, operands: list[HplExpression]) -> HplExpression:
+    # rebuilds a chain of the same operator as `expr`, left-associative
+    result = operands[0]
+    for e in operands[1:]:
+        result = evolve(expr, operand1=result, operand2=e)
+    return result
+
+
+def _flatten(expr: HplExpression, token: str) -> list[HplExpression]:
+    if isinstance(expr, HplBinaryOperator) and expr.operator.token == token:
+        return _flatten(expr.operand1, token) + _flatten(expr.operand2, token)
+    return [expr]
+
+
+def _cost(expr: HplExpression) -> int:
+    cost = 0
+    for node in expr.iterate():
+        if isinstance(node, HplQuantifier):
+            cost += QUANTIFIER_COST
+        elif isinstance(node, HplFunctionCall):
+            cost += FUNCTION_CALL_COST
+        else:
+            cost += 1
+    return cost
+
+
+def _cannot_raise(expr: HplExpression) -> bool:
+    # assumes well-typed messages; indices, divisions and calls may fail
+    for node in expr.iterate():
+        if isinstance(node, (HplArrayAccess, HplFunctionCall, HplQuantifier)):
+            return False
+        if isinstance(node, HplBinaryOperator):
+            if node.operator.is_division or node.operator.is_power:
+                return False
+    return True
@@ -112,12 +112,24 @@ class PatternBasedBuilder:
         self.property_desc = hpl_property.metadata.get('description')
         self.property_text = str(hpl_property)
         self.class_name = 'PropertyMonitor'
+        # shared classes take constants, topics and metadata per instance
+        self.parameterized = False
+        # keyed monitors hold the key of their instance
+        self.keyed = False
+        # whether to expose the next time at which a timeout may fire
+        self.has_deadline = False
+        # whether to record call counts, timings and state transitions
+        self.instrumented = False
         self._activator = None
         self._trigger = None
         self.reentrant_scope = False
         self.timeout = hpl_property.pattern.max_time
         if self.timeout == INF:
             self.timeout = -1
+        # whether timeouts are checked (optimizations drop unreachable ones)
+        self.has_timer = self.timeout > 0.0
+        # the state upon entering the scope
+        self.entry_state = s0
         event = hpl_property.scope.activator
         self.launch_enters_scope = event is None
         if event is not None and event.is_simple_event:
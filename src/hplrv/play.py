@@ -4,6 +4,11 @@
 """
 Module that contains the 'replay' command line program and a utility
 to replay traces of messages to test monitors.
+
+With `--soak`, it runs a load test of the live monitoring pipeline instead:
+messages are dispatched at a target rate for a fixed duration, monitors are
+relaunched upon each verdict, and a probe client measures how long verdicts
+take to reach the clients of the live monitoring server.
 """
 
 ###############################################################################
@@ -12,16 +17,23 @@ to replay traces of messages to test monitors.
 
 from typing import Any, Final
 
+from collections.abc import Iterator
+
 import argparse
 import importlib.util
+from itertools import cycle
 import json
 from pathlib import Path
 from random import shuffle
+import socket
 import sys
 from threading import Thread
-from time import sleep
+from time import perf_counter, sleep
+
+from attrs import define, field, frozen
 
-from hplrv.traces import Trace
+from hplrv.cli import positive_float
+from hplrv.traces import Message, Trace
 
 ###############################################################################
 # Constants
@@ -29,11 +41,89 @@ from hplrv.traces import Trace
 
 PROG_PLAY: Final[str] = 'hpl-rv play'
 
+# soak tests only sleep when ahead of schedule by more than this (seconds)
+SOAK_SLACK: Final[float] = 0.001
+
+# period of queue depth samples during soak tests (seconds)
+SOAK_SAMPLE_PERIOD: Final[float] = 0.1
+
 
 def noop(*args, **kwargs):
     pass
 
 
+###############################################################################
+# Data Structures
+###############################################################################
+
+
+@frozen
+class SoakReport:
+    duration: float
+    messages: int
+    target_rate: float
+    achieved_rate: float
+    verdicts: int
+    # verdict delivery latency to the probe client, in milliseconds
+    latency_ms: dict[str, float]
+    # verdicts that the probe client received
+    delivered: int
+    # most clients connected at once, including the probe
+    clients: int
+    # verdicts waiting to be sent, across all clients
+    max_queue_depth: int
+    mean_queue_depth: float
+    # how far the dispatch loop fell behind schedule, in milliseconds
+    max_lag_ms: float
+
+
+@define
+class VerdictProbe:
+    # a live monitoring client that timestamps the verdicts it receives
+    host: str
+    port: int
+    # emission and reception times of each verdict, by sequence number;
+    # verdicts may arrive before the manager callback records their emission
+    emitted: dict[int, float] = field(factory=dict)
+    received: dict[int, float] = field(factory=dict)
+    _socket: Any = None
+    _thread: Thread | None = None
+
+    def connect(self, timeout: float = 10.0) -> None:
+        self._socket = socket.create_connection((self.host, self.port), timeout=timeout)
+        self._socket.sendall(b'{}\n')
+        stream = self._socket.makefile('rb')
+        stream.readline()  # header with the initial report
+        self._socket.settimeout(None)
+        self._thread = Thread(target=self._run, args=(stream,), name='verdict probe', daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float = 1.0) -> None:
+        # waits a little for verdicts in flight
+        if self._socket is None:
+            return
+        sleep(timeout)
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._socket.close()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def latencies(self) -> list[float]:
+        return [t - self.emitted[seq] for seq, t in self.received.items() if seq in self.emitted]
+
+    def _run(self, stream: Any) -> None:
+        try:
+            for line in stream:
+                now = perf_counter()
+                self.received[json.loads(line).get('seq')] = now
+        except (OSError, ValueError):
+            pass
+
+
 ###############################################################################
 # Setup Functions
 ###############################################################################
@@ -109,6 +199,153 @@ def trace_replay(monitor, trace: Trace, freq: float, shutdown: bool = True) -> f
     return now
 
 
+def soak_messages(
+    monitor: Any,
+    trace: Trace | None = None,
+    seed: int = 0,
+) -> Iterator[tuple[str, Any]]:
+    """
+    Yields (topic, data) pairs endlessly: the messages of the trace, in a loop,
+    or synthetic messages for the properties of the monitors.
+    """
+    if trace is not None:
+        messages = [(msg.topic, msg.data) for event in trace.events for msg in event.messages]
+        if not messages:
+            raise ValueError('the trace has no messages')
+        return cycle(messages)
+    return _synthetic_messages(monitor, seed)
+
+
+def soak_test(
+    monitor: Any,
+    messages: Iterator[tuple[str, Any]],
+    rate: float,
+    duration: float,
+    freq: float,
+    server: Any = None,
+    probe: VerdictProbe | None = None,
+) -> SoakReport:
+    """
+    Dispatches messages to the monitor at the target rate (Hz) for the given
+    duration (seconds), with timer events every `freq` seconds.
+    Monitors are relaunched upon each verdict, to keep verdicts flowing.
+    Timestamps are the seconds elapsed since the start.
+    The monitor (and its live server) is left running.
+    """
+    decided = []
+    verdicts = 0
+
+    def on_verdict(mon, timestamp, witness):
+        nonlocal verdicts
+        verdicts += 1
+        decided.append(mon)
+        if probe is not None and server is not None:
+            # the server numbers each verdict before the manager callback
+            probe.emitted[server.seq] = perf_counter()
+
+    monitor.on_monitor_success = on_verdict
+    monitor.on_monitor_failure = on_verdict
+    callbacks: dict[str, Any] = {}
+    depths = []
+    clients = 0
+    max_lag = 0.0
+    n = 0
+    start = perf_counter()
+    monitor.launch(0.0)
+    next_timer = freq
+    next_sample = 0.0
+    now = 0.0
+    while now < duration:
+        due = n / rate
+        now = perf_counter() - start
+        if due - now > SOAK_SLACK:
+            sleep(due - now)
+            now = perf_counter() - start
+        max_lag = max(max_lag, now - due)
+        topic, data = next(messages)
+        cb: Any = callbacks.get(topic)
+        if cb is None:
+            cb = getattr(monitor, f'on_msg_{topic.replace("/", "_")}', noop)
+            callbacks[topic] = cb
+        cb(data, now)
+        n += 1
+        if now >= next_timer:
+            monitor.on_timer(now)
+            next_timer += freq
+        while decided:
+            mon = decided.pop()
+            mon.on_shutdown(now)
+            mon.on_launch(now)
+        if server is not None and now >= next_sample:
+            live_clients = server.clients
+            clients = max(clients, len(live_clients))
+            depths.append(sum(client.verdict_queue.qsize() for client in live_clients))
+            next_sample += SOAK_SAMPLE_PERIOD
+    elapsed = perf_counter() - start
+    if probe is not None:
+        probe.close()
+    latencies = sorted(1000.0 * t for t in probe.latencies) if probe is not None else []
+    return SoakReport(
+        elapsed,
+        n,
+        rate,
+        n / elapsed if elapsed > 0 else 0.0,
+        verdicts,
+        _percentiles(latencies),
+        len(latencies),
+        clients,
+        max(depths, default=0),
+        sum(depths) / len(depths) if depths else 0.0,
+        1000.0 * max_lag,
+    )
+
+
+def print_soak_report(report: SoakReport) -> None:
+    print(f'Duration: {report.duration:.1f} s')
+    rates = f'{report.achieved_rate:.0f}/s of {report.target_rate:.0f}/s'
+    print(f'Messages: {report.messages} ({rates})')
+    print(f'Verdicts: {report.verdicts} ({report.verdicts / report.duration:.0f}/s)')
+    print(f'Delivered to probe: {report.delivered}')
+    latency = ', '.join(f'{key} {value:.2f}' for key, value in report.latency_ms.items())
+    print(f'Delivery latency (ms): {latency or "n/a"}')
+    print(f'Clients: {report.clients}')
+    print(f'Client queue depth: max {report.max_queue_depth}, mean {report.mean_queue_depth:.1f}')
+    print(f'Maximum dispatch lag: {report.max_lag_ms:.2f} ms')
+
+
+def _synthetic_messages(monitor: Any, seed: int) -> Iterator[tuple[str, Any]]:
+    # models are built upfront, so that they do not delay the first message
+    from hpl.errors import HplSyntaxError
+    from hpl.parser import property_parser
+
+    from hplrv.synth import synthesize, topic_models
+
+    parser = property_parser()
+    properties = []
+    for mon in monitor.monitors:
+        try:
+            properties.append(parser.parse(mon.HPL_PROPERTY))
+        except HplSyntaxError:
+            # the text of some properties does not parse back (e.g., `(-7)`)
+            continue
+    models = topic_models(properties)
+    events = synthesize(models.values(), float('inf'), seed=seed)
+    return (
+        (msg['topic'], Message.from_dict(msg).data)
+        for event in events
+        for msg in event['messages']
+    )
+
+
+def _percentiles(values: list[float]) -> dict[str, float]:
+    n = len(values)
+    if not n:
+        return {}
+    stats = {f'p{p}': values[min(n - 1, n * p // 100)] for p in (50, 90, 99)}
+    stats['max'] = values[-1]
+    return stats
+
+
 ###############################################################################
 # Entry Point
 ###############################################################################
@@ -125,6 +362,8 @@ def subprogram(
 def run(args: dict[str, Any], _settings: dict[str, Any]) -> int:
     file_path: Path | None = args['module'].resolve(strict=True)
     lib = import_generated_monitors(file_path.stem, file_path)
+    if args.get('soak'):
+        return _run_soak(lib, args)
     file_path = args.get('data')
     if file_path is None:
         return 0
@@ -133,9 +372,15 @@ def run(args: dict[str, Any], _settings: dict[str, Any]) -> int:
     man = lib.HplMonitorManager()
     man.on_monitor_success = print_monitor_success
     man.on_monitor_failure = print_monitor_failure
-    man.live_server.host = args['host']
-    man.live_server.port = args['port']
-    thread: Thread = man.live_server.start_thread()
+    server = getattr(man, 'live_server', None)
+    if server is None:
+        # the library was generated without live monitoring
+        trace_replay(man, trace, freq, shutdown=True)
+        print('End of trace.')
+        return 0
+    server.host = args['host']
+    server.port = args['port']
+    thread: Thread = server.start_thread()
     timestamp = trace_replay(man, trace, freq, shutdown=False)
     print('End of trace.')
     print('Press Ctrl+C to exit.')
@@ -149,6 +394,33 @@ def run(args: dict[str, Any], _settings: dict[str, Any]) -> int:
     return 0
 
 
+def _run_soak(lib: Any, args: dict[str, Any]) -> int:
+    trace = None
+    if args.get('data') is not None:
+        trace = import_trace_from_json_file(args['data'])
+    man = lib.HplMonitorManager()
+    messages = soak_messages(man, trace)
+    server = getattr(man, 'live_server', None)
+    probe = None
+    if server is not None:
+        server.host = args['host']
+        server.port = args['port']
+        server.start_thread()
+        probe = VerdictProbe(args['host'], args['port'])
+        probe.connect()
+    report = soak_test(
+        man,
+        messages,
+        args['rate'],
+        args['soak'],
+        args['timer_period'],
+        server=server,
+        probe=probe,
+    )
+    print_soak_report(report)
+    return 0
+
+
 ###############################################################################
 # Argument Parsing
 ###############################################################################
@@ -193,5 +465,29 @@ def parse_arguments(argv: list[str] | None) -> dict[str, Any]:
         help=f'timestamp increment between trace events (default: 1)',
     )
 
+    parser.add_argument(
+        '--soak',
+        type=positive_float,
+        metavar='SECONDS',
+        help='load test the monitors for the given duration, '
+             'looping over the trace or with synthetic messages',
+    )
+
+    parser.add_argument(
+        '-r',
+        '--rate',
+        type=positive_float,
+        default=1000.0,
+        help='messages per second with --soak (default: 1000)',
+    )
+
+    parser.add_argument(
+        '--timer-period',
+        type=positive_float,
+        default=1.0,
+        metavar='SECONDS',
+        help='time between timer events with --soak (default: 1)',
+    )
+
     args = parser.parse_args(args=argv)
     return vars(args)
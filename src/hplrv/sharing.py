@@ -0,0 +1,177 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André Santos
+
+"""
+Module that factors literal values and topic names out of HPL properties,
+so that structurally identical properties can share a monitor class.
+"""
+
+###############################################################################
+# Imports
+###############################################################################
+
+from typing import Any, Final
+
+from attrs import fields, frozen
+from hpl.ast import HplExpression, HplPredicate, HplProperty
+
+from hplrv.monitors import PatternBasedBuilder
+
+###############################################################################
+# Constants
+###############################################################################
+
+# stands for the class name while rendering a shared class
+CLASS_PLACEHOLDER: Final[str] = '__hplrv_class__'
+
+# stands for the i-th topic name while rendering a shared class
+TOPIC_PLACEHOLDER: Final[str] = '__hplrv_t{}__'
+
+###############################################################################
+# Data Structures
+###############################################################################
+
+
+@frozen
+class PropertyParameters:
+    # Python code of each literal value, in traversal order
+    constants: tuple[str, ...]
+    # topic names, in traversal order
+    topics: tuple[str, ...]
+
+    @property
+    def constants_code(self) -> str:
+        if len(self.constants) == 1:
+            return f'({self.constants[0]},)'
+        return f'({", ".join(self.constants)})'
+
+
+class _Parameter:
+    # renders as a reference to the instance constants in generated code,
+    # while comparing and hashing as the original value
+    code: str
+
+    def __str__(self) -> str:
+        return self.code
+
+
+class _IntParameter(_Parameter, int):
+    pass
+
+
+class _FloatParameter(_Parameter, float):
+    pass
+
+
+class _StrParameter(_Parameter, str):
+    pass
+
+
+###############################################################################
+# Interface
+###############################################################################
+
+
+def parameterize(hpl_property: HplProperty) -> tuple[HplProperty, PropertyParameters]:
+    """
+    Returns a copy of the given property where non-boolean literals render as
+    `self._k[i]` and topic names are replaced with placeholders,
+    along with the values that were factored out.
+    """
+    constants: list[str] = []
+    topics: dict[str, str] = {}
+
+    def on_expr(expr: HplExpression) -> HplExpression:
+        if expr.is_function_call:
+            # arguments may drive code generation (e.g., the base of `log`)
+            return expr
+        if expr.is_value and expr.is_literal:
+            return _literal(expr, constants)
+        return expr.reshape(on_expr)
+
+    def on_event(event):
+        if event is None:
+            return None
+        if event.is_event_disjunction:
+            return event.but(event1=on_event(event.event1), event2=on_event(event.event2))
+        name = str(event.name)
+        if name not in topics:
+            topics[name] = TOPIC_PLACEHOLDER.format(len(topics))
+        predicate = event.predicate
+        if not predicate.is_vacuous:
+            predicate = predicate.but(expression=on_expr(predicate.condition))
+        return event.but(name=topics[name], predicate=predicate)
+
+    scope = hpl_property.scope
+    scope = scope.but(activator=on_event(scope.activator), terminator=on_event(scope.terminator))
+    pattern = hpl_property.pattern
+    pattern = pattern.but(trigger=on_event(pattern.trigger), behaviour=on_event(pattern.behaviour))
+    params = PropertyParameters(tuple(constants), tuple(topics))
+    return hpl_property.but(scope=scope, pattern=pattern), params
+
+
+def class_key(hpl_property: HplProperty, builder: PatternBasedBuilder) -> tuple[Any, ...]:
+    """
+    Returns a key such that parameterized properties with equal keys
+    render the same class, without having to render them.
+    Includes the (possibly optimized) transitions of the builder,
+    as these may depend on the values that were factored out.
+    """
+    transitions = []
+    for topic, states in builder.on_msg.items():
+        for state, events in states.items():
+            for event in events:
+                # events compare the original literal values, not their code
+                attributes = tuple(
+                    getattr(event, a.name) for a in fields(type(event)) if a.name != 'predicate'
+                )
+                predicate = event.predicate
+                key = (type(event).__name__, attributes, str(predicate), _ros_types(predicate))
+                transitions.append((topic, int(state), key))
+    return str(hpl_property), tuple(transitions), builder.has_timer
+
+
+def bind_topics(code: str, n: int) -> str:
+    """
+    Replaces topic placeholders in the code of a shared class:
+    quoted names become references to the instance topics,
+    and names within identifiers become positional suffixes.
+    """
+    for i in range(n):
+        placeholder = TOPIC_PLACEHOLDER.format(i)
+        code = code.replace(f"'{placeholder}'", f'self._topics[{i}]')
+        code = code.replace(placeholder, f'_t{i}')
+    return code
+
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+
+def _ros_types(predicate: HplPredicate) -> tuple[str | None, ...]:
+    # message types are not part of the text, but drive code generation
+    if predicate.is_vacuous:
+        return ()
+    return tuple(
+        getattr(getattr(expr, 'ros_type', None), 'type_name', None)
+        for expr in predicate.condition.iterate()
+    )
+
+
+def _literal(expr: HplExpression, constants: list[str]) -> HplExpression:
+    value = expr.value
+    if value is True or value is False:
+        return expr
+    param: _Parameter
+    if isinstance(value, str):
+        param = _StrParameter(value)
+        constants.append(str.__str__(value))
+    elif isinstance(value, int):
+        param = _IntParameter(value)
+        constants.append(repr(int(value)))
+    else:
+        param = _FloatParameter(value)
+        constants.append(repr(float(value)))
+    param.code = f'self._k[{len(constants) - 1}]'
+    return expr.but(token=param.code, value=param)
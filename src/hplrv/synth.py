@@ -0,0 +1,459 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André Santos
+
+"""
+Module that contains the 'synth' command line program and a generator
+of synthetic message traces for load testing.
+
+Messages are published on each topic of a specification at a given rate
+(with exponential inter-arrival times), and their fields are drawn from the
+literals that the predicates of the topic compare them with, so that each
+event is triggered with a given probability. Traces are written to disk
+as they are generated, in the JSON format that `play` and `check` read.
+"""
+
+###############################################################################
+# Imports
+###############################################################################
+
+from typing import Any, Final, TextIO
+
+from collections.abc import Callable, Iterable, Iterator
+
+import argparse
+import heapq
+import json
+import math
+from pathlib import Path
+from random import Random
+import sys
+
+from attrs import field, frozen
+from hpl.ast import HplEvent, HplExpression, HplProperty
+from hpl.parser import specification_parser
+
+from hplrv.check import _literal_value
+from hplrv.gen import TemplateRenderer
+from hplrv.traces import _namespace
+
+###############################################################################
+# Constants
+###############################################################################
+
+PROG_SYNTH: Final[str] = 'hpl-rv synth'
+
+ROLE_ACTIVATOR: Final[str] = 'activator'
+ROLE_TERMINATOR: Final[str] = 'terminator'
+ROLE_TRIGGER: Final[str] = 'trigger'
+ROLE_BEHAVIOUR: Final[str] = 'behaviour'
+
+SCOPE_ROLES: Final[frozenset[str]] = frozenset((ROLE_ACTIVATOR, ROLE_TERMINATOR))
+
+# candidate messages drawn before settling for the closest one
+ATTEMPTS: Final[int] = 20
+
+# values of generated arrays are drawn from the same pool as numbers
+MAX_ARRAY_LENGTH: Final[int] = 4
+
+# names available to rendered predicates, as in generated libraries
+PREDICATE_GLOBALS: Final[dict[str, Any]] = {
+    name: getattr(math, name)
+    for name in (
+        'acos', 'asin', 'atan', 'atan2', 'ceil', 'cos', 'degrees',
+        'floor', 'log', 'log10', 'radians', 'sin', 'sqrt', 'tan',
+    )
+} | {'E': math.e, 'PI': math.pi}
+
+LOGICAL_OPERATORS: Final[frozenset[str]] = frozenset(('and', 'or', 'implies', 'iff'))
+
+FIELD_BOOL: Final[str] = 'bool'
+FIELD_NUMBER: Final[str] = 'number'
+FIELD_STRING: Final[str] = 'string'
+FIELD_ARRAY: Final[str] = 'array'
+
+###############################################################################
+# Data Structures
+###############################################################################
+
+
+@frozen
+class EventCheck:
+    role: str
+    # probability that a message triggers the event
+    probability: float
+    # None if the predicate depends on other messages (e.g., `@a.x`)
+    check: Callable[[Any], bool] | None
+
+
+@frozen
+class FieldModel:
+    kind: str
+    # literal values that predicates compare the field with
+    literals: tuple[Any, ...] = ()
+
+    def sample(self, rng: Random) -> Any:
+        if self.kind == FIELD_BOOL:
+            return rng.random() < 0.5
+        if self.kind == FIELD_STRING:
+            if self.literals and rng.random() < 0.75:
+                return rng.choice(self.literals)
+            return f's{rng.randrange(100)}'
+        if self.kind == FIELD_ARRAY:
+            return [self._number(rng) for _ in range(rng.randint(0, MAX_ARRAY_LENGTH))]
+        return self._number(rng)
+
+    def _number(self, rng: Random) -> Any:
+        numbers = [v for v in self.literals if not isinstance(v, (bool, str))]
+        if not numbers:
+            return rng.randint(-10, 10)
+        if rng.random() < 0.75:
+            # boundary values flip comparisons
+            return rng.choice(numbers) + rng.choice((-1, 0, 0, 1))
+        return rng.randint(int(min(numbers)) - 10, int(max(numbers)) + 10)
+
+
+@frozen
+class TopicModel:
+    name: str
+    # messages per second
+    rate: float
+    fields: dict[tuple[str, ...], FieldModel] = field(factory=dict)
+    events: tuple[EventCheck, ...] = ()
+
+    def sample(self, rng: Random) -> dict[str, Any]:
+        # the message that triggers the largest share of the target events
+        target = [rng.random() < event.probability for event in self.events]
+        best, best_score = {}, -1
+        for _ in range(ATTEMPTS):
+            data = self._draw(rng)
+            score = self._score(data, target)
+            if score > best_score:
+                best, best_score = data, score
+                if score == len(target):
+                    break
+        return best
+
+    def _draw(self, rng: Random) -> dict[str, Any]:
+        data: dict[str, Any] = {}
+        for path, model in self.fields.items():
+            parent = data
+            for name in path[:-1]:
+                parent = parent.setdefault(name, {})
+            if isinstance(parent, dict):
+                parent[path[-1]] = model.sample(rng)
+        return data
+
+    def _score(self, data: dict[str, Any], target: list[bool]) -> int:
+        msg = _namespace(data)
+        score = 0
+        for event, wanted in zip(self.events, target):
+            if event.check is None or _holds(event.check, msg) is wanted:
+                score += 1
+        return score
+
+
+###############################################################################
+# Interface
+###############################################################################
+
+
+def topic_models(
+    properties: Iterable[HplProperty],
+    default_rate: float = 10.0,
+    rates: dict[str, float] | None = None,
+    satisfy: float = 0.5,
+    activate: float = 0.1,
+) -> dict[str, TopicModel]:
+    """
+    Returns a model of the messages of each topic in the given properties.
+    Events of the pattern are triggered with probability `satisfy`,
+    and those of the scope with probability `activate`.
+    """
+    rates = rates or {}
+    renderer = TemplateRenderer.from_pkg_data()
+    fields: dict[str, dict[tuple[str, ...], FieldModel]] = {}
+    events: dict[str, list[EventCheck]] = {}
+    for p in properties:
+        for role, event in _events(p):
+            topic = str(event.name)
+            topic_fields = fields.setdefault(topic, {})
+            topic_events = events.setdefault(topic, [])
+            predicate = event.predicate
+            if predicate.is_vacuous:
+                continue
+            _collect_fields(predicate.condition, topic_fields)
+            probability = activate if role in SCOPE_ROLES else satisfy
+            check = _compile_predicate(renderer, predicate.condition)
+            topic_events.append(EventCheck(role, probability, check))
+    return {
+        topic: TopicModel(
+            topic, rates.get(topic, default_rate), fields[topic], tuple(events[topic])
+        )
+        for topic in fields
+    }
+
+
+def synthesize(
+    models: Iterable[TopicModel],
+    duration: float,
+    max_messages: int | None = None,
+    seed: int = 0,
+) -> Iterator[dict[str, Any]]:
+    """
+    Yields trace events, in the JSON trace format, lazily and in order.
+    Timestamps are rounded to microseconds; simultaneous messages share an event.
+    """
+    rng = Random(seed)
+    heap = []
+    for i, model in enumerate(models):
+        if model.rate > 0:
+            heap.append((rng.expovariate(model.rate), i, model))
+    heapq.heapify(heap)
+    n = 0
+    event: dict[str, Any] | None = None
+    while heap and (max_messages is None or n < max_messages):
+        t, i, model = heapq.heappop(heap)
+        if t > duration:
+            break
+        stamp = round(t, 6)
+        if event is not None and event['timestamp'] != stamp:
+            yield event
+            event = None
+        if event is None:
+            event = {'timestamp': stamp, 'messages': []}
+        event['messages'].append({'topic': model.name, 'data': model.sample(rng)})
+        n += 1
+        heapq.heappush(heap, (t + rng.expovariate(model.rate), i, model))
+    if event is not None:
+        yield event
+
+
+def write_trace(events: Iterable[dict[str, Any]], stream: TextIO) -> int:
+    """
+    Writes events as a JSON array, one event per line, as they come.
+    Returns the number of messages written.
+    """
+    n = 0
+    stream.write('[')
+    sep = '\n'
+    for event in events:
+        stream.write(sep)
+        stream.write(json.dumps(event))
+        sep = ',\n'
+        n += len(event['messages'])
+    stream.write('\n]\n')
+    return n
+
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+
+def _events(hpl_property: HplProperty) -> Iterator[tuple[str, HplEvent]]:
+    scope = hpl_property.scope
+    pattern = hpl_property.pattern
+    for role, event in (
+        (ROLE_ACTIVATOR, scope.activator),
+        (ROLE_TERMINATOR, scope.terminator),
+        (ROLE_TRIGGER, pattern.trigger),
+        (ROLE_BEHAVIOUR, pattern.behaviour),
+    ):
+        if event is not None:
+            for simple_event in event.simple_events():
+                yield role, simple_event
+
+
+def _collect_fields(expr: HplExpression, fields: dict[tuple[str, ...], FieldModel]) -> None:
+    literals: dict[tuple[str, ...], list[Any]] = {}
+    for node in expr.iterate():
+        if node.is_operator and node.arity == 2 and node.operator.token not in LOGICAL_OPERATORS:
+            a, b = node.operand1, node.operand2
+            for x, y in ((a, b), (b, a)):
+                path = _value_path(x)
+                if path is not None:
+                    found = literals.setdefault(path, [])
+                    found.extend(_literal_value(v) for v in y.iterate() if _is_literal(v))
+    for node in expr.iterate():
+        if not node.is_accessor or not node.is_field:
+            continue
+        path = _value_path(node)
+        if path is None or node.can_be_message and not node.can_be_number:
+            continue
+        old = fields.get(path)
+        values = tuple(literals.get(path, ()))
+        if old is not None:
+            values = old.literals + tuple(v for v in values if v not in old.literals)
+        fields[path] = FieldModel(_field_kind(node), values)
+
+
+def _field_kind(node: HplExpression) -> str:
+    if node.can_be_array:
+        return FIELD_ARRAY
+    if node.can_be_string and not node.can_be_number and not node.can_be_bool:
+        return FIELD_STRING
+    if node.can_be_bool and not node.can_be_number:
+        return FIELD_BOOL
+    return FIELD_NUMBER
+
+
+def _value_path(expr: HplExpression) -> tuple[str, ...] | None:
+    # path of a message field (array elements count as the array itself)
+    path = []
+    while expr.is_accessor:
+        if expr.is_field:
+            path.append(str(expr.field))
+            expr = expr.message
+        else:
+            path.clear()
+            expr = expr.array
+    if not path or not (expr.is_value and expr.is_reference and expr.is_this_msg):
+        return None
+    return tuple(reversed(path))
+
+
+def _is_literal(expr: HplExpression) -> bool:
+    return bool(expr.is_value and expr.is_literal)
+
+
+def _compile_predicate(
+    renderer: TemplateRenderer,
+    expr: HplExpression,
+) -> Callable[[Any], bool] | None:
+    if expr.external_references():
+        return None
+    data = {'expression': expr, 'message': 'msg'}
+    code = renderer.render_template('py/expression.py.jinja', data)
+    check: Callable[[Any], bool] = eval(f'lambda msg: {code}', dict(PREDICATE_GLOBALS))
+    return check
+
+
+def _holds(check: Callable[[Any], bool], msg: Any) -> bool:
+    try:
+        return bool(check(msg))
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError, ZeroDivisionError):
+        return False
+
+
+def _parse_rate(text: str) -> tuple[str, float]:
+    topic, sep, rate = text.rpartition('=')
+    if not sep or not topic:
+        raise argparse.ArgumentTypeError(f'expected TOPIC=HZ: {text}')
+    return topic, float(rate)
+
+
+def _probability(text: str) -> float:
+    value = float(text)
+    if not 0.0 <= value <= 1.0:
+        raise argparse.ArgumentTypeError(f'expected a probability in [0, 1]: {text}')
+    return value
+
+
+###############################################################################
+# Entry Point
+###############################################################################
+
+
+def subprogram(
+    argv: list[str] | None,
+    _settings: dict[str, Any] | None = None,
+) -> int:
+    args = parse_arguments(argv)
+    return run(args, _settings or {})
+
+
+def run(args: dict[str, Any], _settings: dict[str, Any]) -> int:
+    parser = specification_parser()
+    properties: list[HplProperty] = []
+    for input_path in args['files']:
+        text: str = Path(input_path).read_text(encoding='utf-8').strip()
+        properties.extend(parser.parse(text).properties)
+    models = topic_models(
+        properties,
+        default_rate=args['rate'],
+        rates=dict(args['topic_rate']),
+        satisfy=args['satisfy'],
+        activate=args['activate'],
+    )
+    events = synthesize(
+        models.values(),
+        args['duration'],
+        max_messages=args.get('messages'),
+        seed=args['seed'],
+    )
+    if not args.get('output'):
+        write_trace(events, sys.stdout)
+        return 0
+    path: Path = Path(args['output']).resolve(strict=False)
+    with path.open('w', encoding='utf-8') as stream:
+        n = write_trace(events, stream)
+    print(f'{PROG_SYNTH}: wrote {n} messages to {path}', file=sys.stderr)
+    return 0
+
+
+###############################################################################
+# Argument Parsing
+###############################################################################
+
+
+def parse_arguments(argv: list[str] | None) -> dict[str, Any]:
+    description = 'Generate synthetic message traces from HPL specifications.'
+    parser = argparse.ArgumentParser(prog=PROG_SYNTH, description=description)
+
+    parser.add_argument('-o', '--output', help='JSON file to write the trace to (default: stdout)')
+
+    parser.add_argument(
+        '-d',
+        '--duration',
+        type=float,
+        default=60.0,
+        help='duration of the trace, in seconds (default: 60)',
+    )
+
+    parser.add_argument(
+        '-n',
+        '--messages',
+        type=int,
+        help='stop after this many messages',
+    )
+
+    parser.add_argument(
+        '-r',
+        '--rate',
+        type=float,
+        default=10.0,
+        help='messages per second on each topic (default: 10)',
+    )
+
+    parser.add_argument(
+        '-R',
+        '--topic-rate',
+        type=_parse_rate,
+        action='append',
+        default=[],
+        metavar='TOPIC=HZ',
+        help='messages per second on a given topic (0 to mute it)',
+    )
+
+    parser.add_argument(
+        '--satisfy',
+        type=_probability,
+        default=0.5,
+        metavar='P',
+        help='probability that a message triggers each pattern event (default: 0.5)',
+    )
+
+    parser.add_argument(
+        '--activate',
+        type=_probability,
+        default=0.1,
+        metavar='P',
+        help='probability that a message triggers each scope event (default: 0.1)',
+    )
+
+    parser.add_argument('--seed', type=int, default=0, help='random seed (default: 0)')
+
+    parser.add_argument('files', nargs='+', help='input HPL specification files')
+
+    args = parser.parse_args(args=argv)
+    return vars(args)
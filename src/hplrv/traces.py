@@ -26,7 +26,7 @@ class Message:
 
     @classmethod
     def from_dict(cls, data: Mapping[str, Any]) -> 'Message':
-        return cls(data['topic'], SimpleNamespace(**data.get('data', {})))
+        return cls(data['topic'], _namespace(data.get('data', {})))
 
 
 @frozen(order=True)
@@ -111,3 +111,10 @@ def insort_event(events: list[TraceEvent], event: TraceEvent) -> None:
 
 def get_timestamp(event: TraceEvent) -> float:
     return event.timestamp
+
+
+def _namespace(data: Any) -> Any:
+    # nested messages also support attribute access
+    if isinstance(data, Mapping):
+        return SimpleNamespace(**{key: _namespace(value) for key, value in data.items()})
+    return data
@@ -106,3 +106,14 @@ ARRAY_000: Final[Array] = Array((0, 0, 0))
 ARRAY_010: Final[Array] = Array((0, 1, 0))
 ARRAY_111: Final[Array] = Array((1, 1, 1))
 ARRAY_123: Final[Array] = Array((1, 2, 3))
+
+###############################################################################
+# Helper Functions
+###############################################################################
+
+
+def load_generated(code: str, name: str = '<generated>') -> dict[str, Any]:
+    # namespace of a generated Python library
+    namespace: dict[str, Any] = {}
+    exec(compile(code, name, 'exec'), namespace)
+    return namespace
@@ -7,11 +7,13 @@
 
 import asyncio
 import importlib.util
+import json
 from pathlib import Path
 import sys
 from threading import Thread
 
 from hplrv.gen import lib_from_properties
+from hplrv.gui import FRAME_LENGTH, decode_verdict_frame
 from ..common_data import Point2D
 
 ###############################################################################
@@ -62,17 +64,55 @@ def test_live_monitoring_server():
 
 async def integration_task(man, thread: Thread):
     reader, writer = await asyncio.open_connection(HOST, PORT)
-    report = await reader.readline()
-    assert report.decode('utf8').startswith('[')
+    writer.write(b'{}\n')
+    header = json.loads(await reader.readline())
+    assert header['seq'] == 0
+    assert len(header['report']) == 2
     man.launch(0.0)
     man.on_timer(0.2)
     assert man.monitors[1].verdict is True
-    report = await reader.readline()
-    assert report.decode('utf8').startswith('{')
+    report = json.loads(await reader.readline())
+    assert report['seq'] == 1
+    assert report['monitor'] == 1
+    writer.close()
     man.on_msg__a(Point2D(x=-1), 0.5)
     assert man.monitors[0].verdict is False
-    report = await reader.readline()
-    assert report.decode('utf8').startswith('{')
+
+    # resume the session, expecting only the missed verdict
+    reader, writer = await asyncio.open_connection(HOST, PORT)
+    request = {'session': header['session'], 'seq': 1}
+    writer.write(json.dumps(request).encode('utf8') + b'\n')
+    header = json.loads(await reader.readline())
+    assert header['seq'] == 1
+    assert header['report'] is None
+    report = json.loads(await reader.readline())
+    assert report['seq'] == 2
+    assert report['monitor'] == 0
+    assert report['value'] is False
+
+    # unknown sessions get a full snapshot instead
+    reader, writer = await asyncio.open_connection(HOST, PORT)
+    writer.write(b'{"session":"unknown","seq":1}\n')
+    header = json.loads(await reader.readline())
+    assert header['seq'] == 2
+    assert [m['verdict'] for m in header['report']] == [False, True]
+
+    # binary clients get length-prefixed frames after the JSON header
+    reader, writer = await asyncio.open_connection(HOST, PORT)
+    request = {'session': header['session'], 'seq': 0, 'format': 'binary'}
+    writer.write(json.dumps(request).encode('utf8') + b'\n')
+    header = json.loads(await reader.readline())
+    assert header['format'] == 'binary'
+    assert header['topics'] == ['/a']
+    topics = []
+    for seq in (1, 2):
+        (length,) = FRAME_LENGTH.unpack(await reader.readexactly(FRAME_LENGTH.size))
+        verdict = decode_verdict_frame(await reader.readexactly(length), topics)
+        assert verdict['seq'] == seq
+    assert verdict['monitor'] == 0
+    assert verdict['witness'][0]['topic'] == '/a'
+    assert verdict['witness'][0]['timestamp'] == 0.5
+
     man.shutdown(1.0)
     thread.join(10.0)
     assert not thread.is_alive()
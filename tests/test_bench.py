@@ -0,0 +1,58 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+import json
+
+from hplrv.bench import (
+    GENERATION_STAGES,
+    benchmark_cases,
+    compare_reports,
+    run_benchmark,
+    run_generation_benchmark,
+)
+
+###############################################################################
+# Tests
+###############################################################################
+
+
+def test_benchmark_covers_every_pattern_and_scope():
+    cases = benchmark_cases()
+    assert len(cases) == 5 * 4 * 2
+    assert len({case.text for case in cases}) == len(cases)
+
+
+def test_benchmark_report_is_comparable():
+    report = run_benchmark(messages=500, select='response/after-until')
+    report = json.loads(json.dumps(report))
+    assert [r['name'] for r in report['results']] == [
+        'response/after-until',
+        'response/after-until/within',
+    ]
+    for result in report['results']:
+        assert result['messages'] > 0
+        assert result['messages_per_second'] > 0
+        latency = result['latency_ns']
+        assert latency['p50'] <= latency['p99'] <= latency['max']
+        assert result['peak_memory_bytes'] > 0
+    assert compare_reports(report, report) == []
+    slower = json.loads(json.dumps(report))
+    slower['results'][0]['messages_per_second'] /= 2
+    assert compare_reports(report, slower) == ['response/after-until']
+
+
+def test_generation_benchmark_times_every_stage(tmp_path):
+    report = run_generation_benchmark(sizes=[20], profile_dir=tmp_path)
+    report = json.loads(json.dumps(report))
+    (result,) = report['results']
+    assert result['name'] == '20'
+    assert set(result['stages_ms']) == set(GENERATION_STAGES)
+    assert 'py/library.py.jinja' in result['templates_ms']
+    assert result['library_bytes'] > 0
+    for stage in GENERATION_STAGES:
+        assert (tmp_path / f'20-{stage}.prof').is_file()
+    assert compare_reports(report, report) == []
@@ -0,0 +1,189 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+from random import Random
+from types import SimpleNamespace
+
+import pytest
+
+from hpl.parser import property_parser
+
+from hplrv.gen import lib_from_properties
+from hplrv.traces import Message, Trace, TraceEvent
+
+###############################################################################
+# Test Data
+###############################################################################
+
+PROPERTIES = (
+    'globally: no /a {x > 5 and s = "on"}',
+    'globally: some /b {x in [2 to 4]} within 3 s',
+    'after /a {x < 2}: /b {abs(x) >= 3} causes /c {s != "off"} within 2 s',
+    'globally: /c {x > 0} requires /a {x = 1} within 4 s',
+    'after /c as C {s = "on"}: /a {x = @C.x} forbids /b within 1 s',
+    'until /c {x > 8}: no /b {x < 0 or not (s = "on")}',
+    'after /a {x > 7} until /c {x < -7}: some /b {x = 0} within 2 s',
+)
+
+# some of these are only decided in later chunks
+PARALLEL_PROPERTIES = (
+    'globally: no /a {x = 9 and s = "on"}',
+    'after /a {x > 7} until /c {x < 0}: no /b {x = 9 and s = "off"}',
+    'after /a {x > 4} until /c {x < 0}: some /b {x = 0} within 2 s',
+    'until /c {x = 9 and s = "on"}: some /b {x = -9 and s = "on"}',
+    'globally: some /b {x = 9 and s = "on"}',
+    'globally: /c {x > 0} requires /a {x = 1} within 4 s',
+)
+
+
+def random_trace(rng: Random) -> Trace:
+    events = []
+    for i in range(200):
+        messages = [
+            Message(topic, SimpleNamespace(x=rng.randint(-9, 9), s=rng.choice(('on', 'off'))))
+            for topic in rng.sample(('/a', '/b', '/c'), rng.randint(1, 2))
+        ]
+        events.append(TraceEvent(i * 0.5, messages))
+    return Trace(events)
+
+
+def replay(code, trace: Trace):
+    namespace = {}
+    exec(code, namespace)
+    man = namespace['HplMonitorManager']()
+    man.launch(0.0)
+    for event in trace.events:
+        for msg in event.messages:
+            cb = getattr(man, 'on_msg_' + msg.topic.replace('/', '_'), None)
+            if cb is not None:
+                cb(msg.data, event.timestamp)
+    man.on_timer(trace.events[-1].timestamp)
+    return man.monitors[0]
+
+
+def counted_check(text: str, trace: Trace):
+    # runs the offline checker, counting the messages delivered to the monitor
+    from hplrv.check import ColumnarTrace, _compile_library, _run_monitor
+
+    data, namespace = _compile_library([property_parser().parse(text)])
+    mon = namespace['HplMonitorManager']().monitors[0]
+    builder = data['instances'][0][1]
+    delivered = []
+
+    def counting(cb):
+        def wrapper(msg, stamp):
+            delivered.append(stamp)
+            return cb(msg, stamp)
+
+        return wrapper
+
+    for topic, cb in mon.cb_map.items():
+        mon.cb_map[topic] = counting(cb)
+    verdict = _run_monitor(mon, builder, ColumnarTrace.from_trace(trace))
+    return verdict, len(delivered)
+
+
+def edge_trace(activations: tuple[int, ...], terminations: tuple[int, ...] = ()) -> Trace:
+    events = []
+    for i in range(10):
+        messages = [Message('/a', SimpleNamespace(x=9 if i in activations else 0, s='on'))]
+        if i in terminations:
+            messages.append(Message('/c', SimpleNamespace(x=-1, s='on')))
+        messages.append(Message('/b', SimpleNamespace(x=9, s='on')))
+        events.append(TraceEvent(float(i), messages))
+    return Trace(events)
+
+###############################################################################
+# Tests
+###############################################################################
+
+
+def test_offline_check_matches_generated_monitors():
+    pytest.importorskip('numpy')
+    from hplrv.check import check_trace
+
+    parser = property_parser()
+    properties = [parser.parse(text) for text in PROPERTIES]
+    libraries = [
+        compile(lib_from_properties([p], live_server=False), text, 'exec')
+        for p, text in zip(properties, PROPERTIES)
+    ]
+    rng = Random(42)
+    for _ in range(5):
+        trace = random_trace(rng)
+        verdicts = check_trace(properties, trace)
+        for text, code, verdict in zip(PROPERTIES, libraries, verdicts):
+            mon = replay(code, trace)
+            assert verdict.value == mon.verdict, text
+            assert verdict.witness == mon.witness, text
+
+
+def test_parallel_check_matches_sequential_check():
+    pytest.importorskip('numpy')
+    from hplrv.check import ColumnarTrace, check_columns
+
+    parser = property_parser()
+    properties = [parser.parse(text) for text in PARALLEL_PROPERTIES]
+    trace = ColumnarTrace.from_trace(random_trace(Random(1)))
+    expected = check_columns(properties, trace)
+    actual = check_columns(properties, trace, jobs=3)
+    for text, a, b in zip(PARALLEL_PROPERTIES, expected, actual):
+        assert (a.value, a.timestamp, a.witness) == (b.value, b.timestamp, b.witness), text
+
+
+def test_balance_shards_by_volume():
+    from hplrv.check import balance
+
+    assert balance([5, 1, 4, 2, 3], 2) == [[0, 1, 3], [2, 4]]
+    assert balance([1, 1], 4) == [[0], [1]]
+
+
+def test_integer_overflow_is_not_vectorized():
+    pytest.importorskip('numpy')
+    from hplrv.check import check_trace
+
+    text = 'globally: no /a {x * x > 0}'
+    trace = Trace([TraceEvent(1.0, [Message('/a', SimpleNamespace(x=2**32))])])
+    code = compile(lib_from_properties([text], live_server=False), text, 'exec')
+    verdict = check_trace([property_parser().parse(text)], trace)[0]
+    assert replay(code, trace).verdict is False
+    assert verdict.value is False
+
+
+def test_messages_before_the_activator_are_skipped():
+    pytest.importorskip('numpy')
+    text = 'after /a {x > 7}: no /b {x = 9}'
+    trace = edge_trace((6,))
+    verdict, delivered = counted_check(text, trace)
+    mon = replay(compile(lib_from_properties([text], live_server=False), text, 'exec'), trace)
+    # the activator and the violating message, not the six /b before them
+    assert delivered == 2
+    assert (verdict.value, verdict.timestamp) == (False, 6.0)
+    assert (verdict.value, verdict.witness) == (mon.verdict, mon.witness)
+
+
+def test_trace_without_activators_is_skipped():
+    pytest.importorskip('numpy')
+    text = 'after /a {x > 7}: no /b {x = 9}'
+    trace = edge_trace(())
+    verdict, delivered = counted_check(text, trace)
+    mon = replay(compile(lib_from_properties([text], live_server=False), text, 'exec'), trace)
+    assert delivered == 0
+    assert verdict.value is None
+    assert mon.verdict is None
+
+
+def test_activators_at_both_edges_of_the_trace():
+    pytest.importorskip('numpy')
+    text = 'after /a {x > 7} until /c {x < 0}: no /b {x = 9}'
+    trace = edge_trace((0, 9), terminations=(0,))
+    verdict, delivered = counted_check(text, trace)
+    mon = replay(compile(lib_from_properties([text], live_server=False), text, 'exec'), trace)
+    # /a and /c at the start, then /a and /b at the end
+    assert delivered == 4
+    assert (verdict.value, verdict.timestamp) == (False, 9.0)
+    assert (verdict.value, verdict.witness) == (mon.verdict, mon.witness)
@@ -0,0 +1,60 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+from types import SimpleNamespace
+
+from hplrv.gen import lib_from_properties, package_from_properties
+
+from .common_data import load_generated
+
+###############################################################################
+# Tests
+###############################################################################
+
+
+def test_instrumented_monitors_record_stats():
+    code = lib_from_properties(
+        [
+            '# id: low\nglobally: no /temp {value > 80}',
+            '# id: high\nglobally: no /temp {value > 90}',
+            '# id: reach\nafter /goal: some /pose {x > 0} within 5 s',
+        ],
+        instrument=True,
+    )
+    namespace = load_generated(code)
+    man = namespace['HplMonitorManager']()
+    man.launch(0.0)
+    man.on_msg__temp(SimpleNamespace(value=10), 1.0)
+    man.on_msg__temp(SimpleNamespace(value=85), 2.0)
+    man.on_msg__goal(SimpleNamespace(), 3.0)
+    man.on_timer(9.0)
+    stats = man.stats()
+    assert stats['callbacks']['/temp']['calls'] == 2
+    assert stats['callbacks']['/temp']['max_ns'] <= stats['callbacks']['/temp']['time_ns']
+    low, high, reach = stats['monitors']
+    assert low['callbacks']['/temp'] == {
+        'calls': 2,
+        'time_ns': low['callbacks']['/temp']['time_ns'],
+        'max_ns': low['callbacks']['/temp']['max_ns'],
+        'predicates': 2,
+    }
+    assert low['transitions'] == 2  # launch, violation
+    assert high['transitions'] == 1
+    assert reach['transitions'] == 3  # launch, scope, timeout
+    assert reach['timer']['calls'] == 1
+    report = man.build_status_report()
+    assert report[0]['verdict'] is False
+    assert report[0]['stats']['transitions'] == 2
+
+
+def test_instrumentation_is_off_by_default():
+    code = lib_from_properties(['globally: no /temp {value > 80}'])
+    assert 'perf_counter_ns' not in code
+    assert 'def stats' not in code
+    modules = package_from_properties(['globally: no /temp {value > 80}'], instrument=True)
+    assert 'def stats' in modules['__init__.py']
+    assert 'perf_counter_ns' in modules['_common.py']
@@ -0,0 +1,66 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+from types import SimpleNamespace
+
+import pytest
+
+from hplrv.gen import lib_from_properties
+
+from .common_data import load_generated
+
+###############################################################################
+# Tests
+###############################################################################
+
+
+def test_keyed_monitors_run_per_key_and_evict_idle_instances():
+    code = lib_from_properties(
+        ['# id: no_overheat\nglobally: no /temp {value > 80}'],
+        live_server=False,
+        key_field='robot',
+        evict_after=10.0,
+    )
+    namespace = load_generated(code)
+    failures = []
+    man = namespace['HplMonitorManager'](
+        failure_cb=lambda mon, stamp, witness: failures.append((mon.key, stamp)),
+    )
+    man.launch(0.0)
+    man.on_msg__temp(SimpleNamespace(robot='r1', value=10), 1.0)
+    man.on_msg__temp(SimpleNamespace(robot='r2', value=90), 2.0)
+    man.on_msg__temp(SimpleNamespace(robot='r1', value=20), 8.0)
+    assert failures == [('r2', 2.0)]
+    family = man.monitors[0]
+    assert family.verdict is False
+    man.on_timer(15.0)
+    assert list(family.instances) == ['r1']
+    man.on_timer(30.0)
+    assert not family.instances
+
+
+def test_vectorized_keyed_monitors_only_run_due_timers():
+    pytest.importorskip('numpy')
+    code = lib_from_properties(
+        ['# id: reach\nafter /goal {x > 0}: some /pose {x > 0} within 5 s'],
+        live_server=False,
+        key_field='robot',
+        vectorized=True,
+    )
+    namespace = load_generated(code)
+    failures = []
+    man = namespace['HplMonitorManager'](
+        failure_cb=lambda mon, stamp, witness: failures.append(mon.key),
+    )
+    man.launch(0.0)
+    for i in range(100):
+        man.on_msg__goal(SimpleNamespace(robot=i, x=1), 1.0)
+    man.on_msg__pose(SimpleNamespace(robot=7, x=1), 2.0)
+    man.on_timer(4.0)
+    assert not failures
+    man.on_timer(6.0)
+    assert len(failures) == 99 and 7 not in failures
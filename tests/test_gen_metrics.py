@@ -0,0 +1,49 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+from types import SimpleNamespace
+
+from hplrv.gen import lib_from_properties, package_from_properties
+
+from .common_data import load_generated
+
+###############################################################################
+# Tests
+###############################################################################
+
+
+def test_metrics_follow_the_prometheus_text_format():
+    code = lib_from_properties(
+        [
+            '# id: low\nglobally: no /temp {value > 80}',
+            '# id: reply\nafter /goal: /a causes /b within 5 s',
+        ],
+        metrics=True,
+    )
+    namespace = load_generated(code)
+    man = namespace['HplMonitorManager']()
+    man.launch(0.0)
+    man.on_msg__temp(SimpleNamespace(value=10), 1.0)
+    man.on_msg__temp(SimpleNamespace(value=90), 2.0)
+    man.on_msg__goal(SimpleNamespace(), 3.0)
+    man.on_msg__a(SimpleNamespace(), 3.5)
+    lines = man.metric_lines()
+    assert 'hplrv_monitor_messages_total{monitor="0",id="low"} 2' in lines
+    assert 'hplrv_monitor_verdicts_total{monitor="0",id="low",verdict="false"} 1' in lines
+    assert 'hplrv_monitor_pool_size{monitor="1",id="reply"} 1' in lines
+    assert 'hplrv_callback_latency_seconds_bucket{topic="/temp",le="+Inf"} 2' in lines
+    assert 'hplrv_callback_latency_seconds_count{topic="/temp"} 2' in lines
+    assert '# TYPE hplrv_callback_latency_seconds histogram' in lines
+    assert man.live_server.metrics_source == man.metric_lines
+
+
+def test_metrics_are_off_by_default():
+    code = lib_from_properties(['globally: no /temp {value > 80}'])
+    assert 'LATENCY_BUCKETS_NS' not in code
+    modules = package_from_properties(['globally: no /temp {value > 80}'], metrics=True)
+    assert 'def metric_lines' in modules['__init__.py']
+    assert 'METRICS_PORT' in modules['_live.py']
@@ -0,0 +1,41 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+from importlib import import_module
+import sys
+from types import SimpleNamespace
+
+from hplrv.gen import package_from_properties
+
+###############################################################################
+# Tests
+###############################################################################
+
+
+def test_package_loads_enabled_monitors_only(tmp_path, monkeypatch):
+    modules = package_from_properties([
+        '# id: no_a\nglobally: no /a {x > 0}',
+        '# id: b_causes_a\nglobally: /b causes /a {x > 0} within 1 s',
+    ])
+    path = tmp_path / 'generated_pkg'
+    path.mkdir()
+    for filename, code in modules.items():
+        (path / filename).write_text(code, encoding='utf-8')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    pkg = import_module('generated_pkg')
+    try:
+        man = pkg.HplMonitorManager(enabled={'no_a'})
+        assert 'generated_pkg.monitor_0' in sys.modules
+        assert 'generated_pkg.monitor_1' not in sys.modules
+        assert 'generated_pkg._live' not in sys.modules
+        man.launch(0.0)
+        man.on_msg__a(SimpleNamespace(x=1), 1.0)
+        assert man.monitors[0].verdict is False
+    finally:
+        for name in list(sys.modules):
+            if name.split('.')[0] == 'generated_pkg':
+                del sys.modules[name]
@@ -0,0 +1,57 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+from types import SimpleNamespace
+
+from hplrv.gen import lib_from_properties
+
+from .common_data import load_generated
+
+###############################################################################
+# Tests
+###############################################################################
+
+
+def test_properties_differing_in_constants_share_a_class():
+    code = lib_from_properties([
+        '# id: hot_1\nglobally: no /sensor1 {temp > 80}',
+        '# id: hot_2\nglobally: no /sensor2 {temp > 95.5}',
+        '# id: cold\nglobally: no /sensor1 {temp < -10 or temp > 200}',
+    ], live_server=False, share_classes=True)
+    assert code.count('class Shared0Monitor:') == 1
+    assert 'class Property2Monitor:' in code
+    namespace = load_generated(code)
+    man = namespace['HplMonitorManager']()
+    assert [mon.PROP_ID for mon in man.monitors] == ['hot_1', 'hot_2', 'cold']
+    man.launch(0.0)
+    man.on_msg__sensor1(SimpleNamespace(temp=90), 1.0)
+    man.on_msg__sensor2(SimpleNamespace(temp=90), 1.0)
+    assert [mon.verdict for mon in man.monitors] == [False, None, None]
+    assert man.monitors[0].witness[0].topic == '/sensor1'
+
+
+def test_folded_guards_do_not_share_a_class():
+    properties = [
+        'globally: no /a {x > 1 and 1 < 2}',
+        'globally: no /b {x > 2 and 2 < 1}',
+        'globally: no /c {x > 3 and 3 < 4}',
+    ]
+    code = lib_from_properties(properties, live_server=False, share_classes=True)
+    assert 'class Shared0Monitor:' in code
+    code = lib_from_properties(properties, live_server=False, share_classes=True, optimization=1)
+    assert code.count('class Shared0Monitor:') == 1
+    assert 'class Property1Monitor:' in code
+
+
+def test_classes_are_not_shared_by_default():
+    code = lib_from_properties([
+        'globally: no /a {x > 1}',
+        'globally: no /b {x > 2}',
+    ], live_server=False)
+    assert 'Shared0Monitor' not in code
+    assert 'class Property0Monitor:' in code
+    assert 'class Property1Monitor:' in code
@@ -0,0 +1,49 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+import gzip
+from wsgiref.util import setup_testing_defaults
+
+from bottle import Bottle
+
+from hplrv.gui import MonitorServer
+
+###############################################################################
+# Tests
+###############################################################################
+
+
+def _get(app, path, **headers):
+    environ = {'PATH_INFO': path}
+    for key, value in headers.items():
+        environ[f'HTTP_{key.upper()}'] = value
+    setup_testing_defaults(environ)
+    result = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        result['status'] = int(status.split()[0])
+        result['headers'] = dict(response_headers)
+
+    result['body'] = b''.join(app(environ, start_response))
+    return result
+
+
+def test_static_assets():
+    server = MonitorServer(Bottle())
+    plain = _get(server.app, '/dashboard.js')
+    assert plain['status'] == 200
+    assert 'Content-Encoding' not in plain['headers']
+    assert plain['headers']['Content-Type'].endswith('charset=UTF-8')
+    compressed = _get(server.app, '/dashboard.js', accept_encoding='gzip, br')
+    assert compressed['headers']['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed['body']) == plain['body']
+    assert compressed['headers']['Etag'] != plain['headers']['Etag']
+    cached = _get(server.app, '/dashboard.js', if_none_match=plain['headers']['Etag'])
+    assert cached['status'] == 304
+    assert cached['body'] == b''
+    assert _get(server.app, '/')['body'].startswith(b'<!DOCTYPE html>')
+    assert _get(server.app, '/missing.js')['status'] == 404
@@ -0,0 +1,92 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+import json
+from socket import socketpair
+
+from hplrv.gen import lib_from_properties
+from hplrv.gui import (
+    FRAME_LENGTH,
+    LiveMonitoringServer,
+    SocketStreamReader,
+    decode_verdict_frame,
+)
+
+from .common_data import load_generated
+
+###############################################################################
+# Tests
+###############################################################################
+
+
+def test_readline_across_chunks():
+    a, b = socketpair()
+    with a, b:
+        reader = SocketStreamReader(b, chunk_size=4)
+        a.sendall(b'{"a":1}\n{"b"')
+        assert reader.readline() == '{"a":1}\n'
+        a.sendall(b':2}\n')
+        assert reader.readline() == '{"b":2}\n'
+        a.close()
+        assert reader.readline() == ''
+
+
+def test_readlines_returns_all_buffered_lines():
+    a, b = socketpair()
+    with a, b:
+        reader = SocketStreamReader(b)
+        a.sendall(b'one\ntwo\nthree\nfo')
+        assert reader.readlines() == [b'one\n', b'two\n', b'three\n']
+        a.sendall(b'ur\n')
+        a.close()
+        assert reader.readlines() == [b'four\n']
+        assert reader.readlines() == []
+
+
+def test_read_exact_and_incomplete():
+    a, b = socketpair()
+    with a, b:
+        reader = SocketStreamReader(b, chunk_size=3)
+        a.sendall(b'header\n0123456789')
+        assert reader.readuntil(b'\n') == b'header\n'
+        assert reader.read(4) == b'0123'
+        assert reader.read(4) == b'4567'
+        a.close()
+        assert reader.read(4) == b'89'
+        assert reader.read(4) == b''
+        assert reader.buffered == 0
+
+
+def test_binary_verdict_frames_round_trip():
+    code = lib_from_properties(['globally: no /a'], live_server=True)
+    namespace = load_generated(code)
+    record = {'topic': '/a', 'timestamp': 1.0, 'message': '{}'}
+    # large specifications and long sessions exceed 16 and 32 bits
+    data = {'seq': 2**40, 'monitor': 70000, 'value': True, 'timestamp': 1.5, 'witness': [record]}
+    frame = namespace['_verdict_to_binary'](data, {})
+    assert FRAME_LENGTH.unpack_from(frame)[0] == len(frame) - FRAME_LENGTH.size
+    topics = []
+    assert decode_verdict_frame(frame[FRAME_LENGTH.size :], topics) == data
+    assert topics == ['/a']
+
+
+def test_legacy_server_sends_a_bare_report():
+    verdicts = []
+    server = LiveMonitoringServer(
+        'localhost', 4242, on_update=lambda update: verdicts.append(update['monitor']['verdict'])
+    )
+    a, b = socketpair()
+    with a:
+        object.__setattr__(server, '_socket', b)
+        a.sendall(json.dumps([{'verdict': None, 'witness': []}]).encode('utf8') + b'\n')
+        verdict = {'monitor': 0, 'value': False, 'witness': [], 'timestamp': 1.0}
+        a.sendall(json.dumps(verdict).encode('utf8') + b'\n')
+        a.close()
+        server.run()
+    assert not server.is_connected
+    assert server.session is None
+    assert verdicts == [None, False]
@@ -0,0 +1,56 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+from hplrv.gui import MonitorStateStore, Subscription
+
+###############################################################################
+# Tests
+###############################################################################
+
+
+def _monitor(verdict=None, witness=None):
+    return {
+        'id': 'p',
+        'title': 'P',
+        'property': 'globally: no /a',
+        'verdict': verdict,
+        'witness': witness,
+    }
+
+
+def test_snapshot_and_delta():
+    store = MonitorStateStore()
+    store.update('h:1', 0, _monitor())
+    store.update('h:1', 1, _monitor())
+    store.update('h:2', 0, _monitor())
+    snapshot = store.snapshot(Subscription(servers=frozenset(['h:1'])))
+    assert [i for i, _ in snapshot['servers']['h:1']] == [0, 1]
+    assert 'h:2' not in snapshot['servers']
+    assert 'witness' not in snapshot['servers']['h:1'][0][1]
+    version = snapshot['version']
+    store.update('h:1', 0, _monitor())  # no change, no new version
+    assert store.delta(version, Subscription()) is None
+    store.update('h:1', 1, _monitor(False, [1]))
+    store.update('h:1', 1, _monitor(False, [1, 2]))  # latest state wins
+    store.update('h:2', 0, _monitor(True, []))
+    delta = store.delta(version, Subscription(servers=frozenset(['h:1'])))
+    assert [i for i, _ in delta['servers']['h:1']] == [1]
+    assert delta['servers']['h:1'][0][1]['verdict'] is False
+    assert delta['summary']['h:2'] == {'monitors': 1, 'success': 1, 'failure': 0}
+    assert store.witness('h:1', 1) == [1, 2]
+
+
+def test_verdict_filter():
+    store = MonitorStateStore()
+    store.update('h:1', 0, _monitor())
+    store.update('h:1', 1, _monitor())
+    pending = Subscription(verdicts=frozenset([None]))
+    version = store.snapshot(pending)['version']
+    store.update('h:1', 1, _monitor(True, []))
+    delta = store.delta(version, pending)
+    assert delta['servers'] == {'h:1': [[1, None]]}
+    assert [i for i, _ in store.snapshot(pending)['servers']['h:1']] == [0]
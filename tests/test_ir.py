@@ -0,0 +1,79 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+from types import SimpleNamespace
+
+from hpl.parser import property_parser
+
+from hplrv.gen import MonitorGenerator, lib_from_properties
+from hplrv.ir import MonitorIR
+from hplrv.monitors import MonitorState
+
+from .common_data import load_generated
+
+###############################################################################
+# Tests
+###############################################################################
+
+
+def test_unreachable_scope_is_removed():
+    hp = property_parser().parse('after /p {1 > 2}: no /a within 1s')
+    builder, _ = MonitorGenerator(optimization=1)._template(hp, False)
+    assert builder.has_timer
+    assert dict(builder.on_msg['/p']) == {}
+    assert MonitorIR.from_builder(builder).reachable_states() == {MonitorState.INACTIVE}
+    builder, _ = MonitorGenerator(optimization=2)._template(hp, False)
+    assert not builder.has_timer
+    assert not builder.on_msg
+
+
+def test_cheap_operands_are_checked_first():
+    text = 'globally: no /a {(a + b * c - d > e) and y > 0}'
+    hp = property_parser().parse(text)
+    builder, _ = MonitorGenerator(optimization=2)._template(hp, False)
+    phi = builder.on_msg['/a'][MonitorState.ACTIVE][0].predicate
+    assert str(phi.condition.operand1) == '(y > 0)'
+    # nothing is moved across operands that may raise
+    for text in ('globally: no /a {y > 0 and x[0] > 0}', 'globally: no /a {x[0] > 0 and y > 0}'):
+        hp = property_parser().parse(text)
+        builder, _ = MonitorGenerator(optimization=2)._template(hp, False)
+        phi = builder.on_msg['/a'][MonitorState.ACTIVE][0].predicate
+        assert phi.condition is hp.pattern.behaviour.predicate.condition
+
+
+def test_optimized_guards_raise_the_same_exceptions():
+    text = 'globally: no /c {y[0] > 0 and x > 2}'
+    outcomes = []
+    for level in (0, 2):
+        code = lib_from_properties([text], live_server=False, optimization=level)
+        namespace = load_generated(code)
+        man = namespace['HplMonitorManager']()
+        man.launch(0.0)
+        try:
+            man.on_msg__c(SimpleNamespace(y=[], x=1), 1.0)
+            outcomes.append(man.monitors[0].verdict)
+        except IndexError:
+            outcomes.append(IndexError)
+    assert outcomes == [IndexError, IndexError]
+
+
+def test_optimized_library_keeps_verdicts():
+    properties = [
+        'globally: no /a {x > 0 and 1 < 2}',
+        'after /p {x > 1 or 2 < 1}: some /b within 1s',
+    ]
+    assert lib_from_properties(properties, optimization=0) == lib_from_properties(properties)
+    code = lib_from_properties(properties, live_server=False, optimization=2)
+    assert 'if (msg.x > 0):' in code
+    assert 'if (msg.x > 1):' in code
+    namespace = load_generated(code)
+    man = namespace['HplMonitorManager']()
+    man.launch(0.0)
+    man.on_msg__p(SimpleNamespace(x=2), 1.0)
+    man.on_msg__a(SimpleNamespace(x=1), 1.5)
+    man.on_timer(3.0)
+    assert [mon.verdict for mon in man.monitors] == [False, False]
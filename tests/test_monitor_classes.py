@@ -167,10 +167,15 @@ def prod(iterable):
 
 class TestMonitorClasses:
     def test_examples(self):
+        self._run_examples(MonitorGenerator(lang='py'))
+
+    def test_optimized_examples(self):
+        self._run_examples(MonitorGenerator(lang='py', optimization=2))
+
+    def _run_examples(self, r):
         self._reset()
         n = 0
         p = property_parser()
-        r = MonitorGenerator(lang='py')
         for text, traces in all_types_of_property():
             hp = p.parse(text)
             self.pool_decay = ((hp.pattern.is_requirement
@@ -5,8 +5,17 @@
 # Imports
 ###############################################################################
 
+import subprocess
+import sys
+
 import hplrv
 
+###############################################################################
+# Constants
+###############################################################################
+
+HEAVY_MODULES = ('bottle', 'gevent', 'hpl', 'jinja2', 'hplrv.gen', 'hplrv.gui', 'hplrv.play')
+
 ###############################################################################
 # Tests
 ###############################################################################
@@ -20,3 +29,27 @@ def test_pkg_has_version():
     assert hasattr(hplrv, '__version__')
     assert isinstance(hplrv.__version__, str)
     assert hplrv.__version__ != ''
+
+
+def _imported_after(code: str) -> set[str]:
+    # a fresh interpreter, so that the modules loaded by other tests do not count
+    script = f'''
+import sys
+try:
+    {code}
+except SystemExit:
+    pass
+print(' '.join(sys.modules))
+'''
+    result = subprocess.run(
+        [sys.executable, '-c', script], capture_output=True, text=True, check=True
+    )
+    return set(result.stdout.split())
+
+
+def test_cli_imports_are_lazy():
+    modules = _imported_after("from hplrv.cli import main; main(['--version'])")
+    assert not modules.intersection(HEAVY_MODULES)
+    modules = _imported_after("from hplrv.cli import main; main(['gen', '--help'])")
+    assert 'hplrv.gen' in modules
+    assert not modules.intersection(('bottle', 'gevent', 'hplrv.gui', 'hplrv.ir'))
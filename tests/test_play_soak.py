@@ -0,0 +1,45 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+import pytest
+
+from hplrv.gen import lib_from_properties
+from hplrv.play import parse_arguments, soak_messages, soak_test
+
+from .common_data import load_generated
+
+###############################################################################
+# Tests
+###############################################################################
+
+
+def test_soak_test_relaunches_monitors_upon_verdicts():
+    code = lib_from_properties(['globally: no /a {x > 0}'], live_server=False)
+    namespace = load_generated(code, '<soak>')
+    man = namespace['HplMonitorManager']()
+    report = soak_test(man, soak_messages(man), 2000.0, 0.5, 0.005)
+    assert report.messages > 500
+    assert report.achieved_rate > 0.0
+    # synthetic messages trigger the event half of the time
+    assert report.messages / 4 < report.verdicts < report.messages * 3 / 4
+    assert report.delivered == 0
+    assert man.monitors[0].is_online_state
+
+
+def test_soak_options_must_be_positive():
+    args = parse_arguments(['monitors.py', '--soak', '1', '--timer-period', '0.01'])
+    assert args['rate'] == 1000.0
+    assert args['timer_period'] == 0.01
+    for option in ('--rate', '--timer-period'):
+        with pytest.raises(SystemExit):
+            parse_arguments(['monitors.py', '--soak', '1', option, '0'])
+
+
+def test_live_server_exposes_its_clients():
+    code = lib_from_properties(['globally: no /a {x > 0}'], live_server=True)
+    namespace = load_generated(code, '<soak>')
+    assert namespace['HplMonitorManager']().live_server.clients == ()
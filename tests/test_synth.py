@@ -0,0 +1,54 @@
+# SPDX-License-Identifier: MIT
+# Copyright © 2023 André Santos
+
+###############################################################################
+# Imports
+###############################################################################
+
+from io import StringIO
+import json
+
+from hpl.parser import specification_parser
+
+from hplrv.synth import synthesize, topic_models, write_trace
+from hplrv.traces import Trace
+
+###############################################################################
+# Constants
+###############################################################################
+
+SPEC = '''
+after /p {ok and pose.x > 3}: /a {data in [1 to 5]} causes /b {name = "done"} within 1 s
+
+globally: no /c {data in {1, 2, 3}}
+'''
+
+###############################################################################
+# Tests
+###############################################################################
+
+
+def test_synthetic_trace_triggers_events_with_given_probability():
+    spec = specification_parser().parse(SPEC)
+    models = topic_models(spec.properties, rates={'/c': 0.0}, satisfy=0.3, activate=0.1)
+    assert set(models) == {'/p', '/a', '/b', '/c'}
+    stream = StringIO()
+    n = write_trace(synthesize(models.values(), 100.0, seed=1), stream)
+    trace = Trace.from_list_of_dict(json.loads(stream.getvalue()))
+    messages = [msg for event in trace.events for msg in event.messages]
+    assert len(messages) == n
+    assert all(msg.topic != '/c' for msg in messages)
+    counts = {}
+    for msg in messages:
+        hits, total = counts.get(msg.topic, (0, 0))
+        if msg.topic == '/p':
+            hit = msg.data.ok and msg.data.pose.x > 3
+        elif msg.topic == '/a':
+            hit = 1 <= msg.data.data <= 5
+        else:
+            hit = msg.data.name == 'done'
+        counts[msg.topic] = (hits + hit, total + 1)
+    expected = {'/p': 0.1, '/a': 0.3, '/b': 0.3}
+    for topic, (hits, total) in counts.items():
+        assert total > 500
+        assert abs(hits / total - expected[topic]) < 0.05